@@ -1,5 +1,10 @@
+import argparse
 import asyncio
+import json
+import time
+from contextlib import AsyncExitStack
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.graph import StateGraph, MessagesState, START
 from langgraph.prebuilt import ToolNode, tools_condition
 import os
@@ -11,6 +16,122 @@ load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 model = init_chat_model("openai:gpt-4o-mini")
 
+MCP_SERVERS = {
+    "db": {
+        "transport": "streamable_http",
+        "url": "http://mcp.hireln.com/database/mcp/",
+    },
+    "gdrive": {
+        "transport": "streamable_http",
+        "url": "http://mcp.hireln.com/google_drive/mcp/",
+    },
+}
+
+
+def build_graph(tools):
+    """Compile the call_model <-> tools agent graph."""
+    model_with_tools = model.bind_tools(tools)
+
+    async def call_model(state: MessagesState):
+        response = await model_with_tools.ainvoke(state["messages"])
+        return {"messages": response}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(call_model)
+    builder.add_node(ToolNode(tools))
+    builder.add_edge(START, "call_model")
+    builder.add_conditional_edges("call_model", tools_condition)
+    builder.add_edge("tools", "call_model")
+    return builder.compile()
+
+
+def _token_usage(messages) -> dict:
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for m in messages:
+        for key, value in (getattr(m, "usage_metadata", None) or {}).items():
+            if key in usage:
+                usage[key] += value
+    return usage
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def _load_batch(input_path: str) -> list[dict]:
+    """Read JSONL queries; a malformed line becomes an item carrying its error."""
+    items = []
+    with open(input_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                if not isinstance(item, dict) or not isinstance(item.get("query"), str) or not item["query"].strip():
+                    raise ValueError('expected an object with a non-empty "query" string')
+            except ValueError as e:
+                item = {"id": f"line {line_no}", "invalid": f"line {line_no}: {e}"}
+            items.append(item)
+    return items
+
+
+async def run_batch(input_path: str, output_path: str, concurrency: int):
+    """Run every query in a JSONL file through the agent graph concurrently.
+
+    Input lines: {"id": optional, "query": "..."}. Each result is written as
+    soon as it finishes, with latency and token usage, followed by a summary.
+    A line that fails (including malformed input) is recorded with an "error".
+    """
+    items = _load_batch(input_path)
+
+    client = MultiServerMCPClient(MCP_SERVERS)
+    results = []
+    async with AsyncExitStack() as stack:
+        # One MCP session per server, shared by every query
+        tools = []
+        for server in MCP_SERVERS:
+            session = await stack.enter_async_context(client.session(server))
+            tools += await load_mcp_tools(session)
+        graph = build_graph(tools)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        out = stack.enter_context(open(output_path, "w", encoding="utf-8"))
+
+        async def run_one(i, item):
+            async with semaphore:
+                record = {"id": item.get("id", i), "query": item.get("query")}
+                started = time.perf_counter()
+                try:
+                    if "invalid" in item:
+                        raise ValueError(item["invalid"])
+                    response = await graph.ainvoke({"messages": [HumanMessage(content=item["query"])]})
+                    messages = response.get("messages", [])
+                    record["answer"] = messages[-1].content if messages else None
+                    record["tools"] = [m.name for m in messages if isinstance(m, ToolMessage)]
+                    record.update(_token_usage(messages))
+                except Exception as e:
+                    record["error"] = str(e)
+                record["latency_s"] = round(time.perf_counter() - started, 3)
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            results.append(record)
+
+        batch_started = time.perf_counter()
+        await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+        elapsed = time.perf_counter() - batch_started
+
+    failed = sum(1 for r in results if "error" in r)
+    # Malformed lines never ran, so they'd only drag the percentiles down
+    latencies = [r["latency_s"] for r in results if r["query"] is not None]
+    tokens = sum(r.get("total_tokens", 0) for r in results)
+    print(f"\n📊 Batch finished: {len(results)} queries ({len(results) - failed} ok, {failed} failed) in {elapsed:.1f}s")
+    print(f"   Throughput: {len(results) / elapsed if elapsed else 0:.2f} queries/s (concurrency {concurrency})")
+    print(f"   Latency: p50 {_percentile(latencies, 0.5):.2f}s, p95 {_percentile(latencies, 0.95):.2f}s, "
+          f"max {max(latencies, default=0):.2f}s")
+    print(f"   Tokens: {tokens:,} total ({tokens / elapsed if elapsed else 0:.0f}/s)")
+    print(f"   Results written to {output_path}")
+
 
 async def main():
     # 1. Setup MCP client (no async with!)
@@ -26,35 +147,13 @@ async def main():
 #         },
 #     }
 # )
-    client = MultiServerMCPClient(
-    {
-        "db": {
-            "transport": "streamable_http",
-            "url": "http://mcp.hireln.com/database/mcp/",
-        },
-        "gdrive": {
-            "transport": "streamable_http",
-            "url": "http://mcp.hireln.com/google_drive/mcp/",
-        },
-    }
-)
+    client = MultiServerMCPClient(MCP_SERVERS)
 
     # 2. Preload tools (optional but good for debugging)
     tools = await client.get_tools()
 
-    # 3. Define call_model node
-    def call_model(state: MessagesState):
-        response = model.bind_tools(tools).invoke(state["messages"])
-        return {"messages": response}
-
-    # 4. Build graph
-    builder = StateGraph(MessagesState)
-    builder.add_node(call_model)
-    builder.add_node(ToolNode(tools))
-    builder.add_edge(START, "call_model")
-    builder.add_conditional_edges("call_model", tools_condition)
-    builder.add_edge("tools", "call_model")
-    graph = builder.compile()
+    # 3-4. Define call_model node and build graph
+    graph = build_graph(tools)
 
     # 5. Run interactive agent loop
     async def run_agent(graph):
@@ -92,4 +191,13 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="HireLN agent: interactive, or batch over a JSONL file")
+    parser.add_argument("--batch", metavar="INPUT", help='JSONL file of {"id", "query"} lines to run unattended')
+    parser.add_argument("--output", default="agent_results.jsonl", help="where batch results are written")
+    parser.add_argument("--concurrency", type=int, default=8, help="queries in flight at once in batch mode")
+    args = parser.parse_args()
+
+    if args.batch:
+        asyncio.run(run_batch(args.batch, args.output, max(1, args.concurrency)))
+    else:
+        asyncio.run(main())
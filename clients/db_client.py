@@ -2,6 +2,7 @@
 import asyncio
 from mcp import ClientSession, types
 from mcp.client.stdio import stdio_client, StdioServerParameters
+from llm.summarize import summarize_tool_output
 from llm.llm_client import ask_llm  # helper to call LLM
 
 server_params = StdioServerParameters(
@@ -36,12 +37,8 @@ async def run():
             tool_output = content.text if isinstance(content, types.TextContent) else str(content)
             print("Tool raw output:\n", tool_output)
 
-            # 🔹 Step 3: Summarize final answer with LLM
-            final_answer = await ask_llm(
-                f"User asked: {user_query}\n"
-                f"Tool output: {tool_output}\n\n"
-                "Give a clear and helpful response."
-            )
+            # 🔹 Step 3: Summarize final answer with LLM (map-reduce if the output is large)
+            final_answer = await summarize_tool_output(user_query, tool_output)
 
             print("\n🤖 Assistant Response:\n", final_answer)
 
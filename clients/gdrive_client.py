@@ -3,6 +3,7 @@ import json
 import re
 from mcp import ClientSession, types
 from mcp.client.stdio import stdio_client, StdioServerParameters
+from llm.summarize import summarize_tool_output
 from llm.llm_client import ask_llm  # your helper that queries LLM
 
 # MCP server params (make sure gdrive_server.py is running with "uv run")
@@ -60,12 +61,8 @@ async def run():
             tool_output = content.text if isinstance(content, types.TextContent) else str(content)
             print("Tool raw output:\n", tool_output)
 
-            # Step 4: Summarize final answer with LLM
-            final_answer = await ask_llm(
-                f"User asked: {user_query}\n"
-                f"Tool output: {tool_output}\n\n"
-                "Give a clear and helpful response."
-            )
+            # Step 4: Summarize final answer with LLM (map-reduce if the output is large)
+            final_answer = await summarize_tool_output(user_query, tool_output)
 
             print("\n🤖 Assistant Response:\n", final_answer)
 
@@ -0,0 +1,121 @@
+"""Token-budgeted final answers over tool output.
+
+Small outputs go to the LLM as-is. Slight overflows are trimmed to their head
+and tail. Large outputs are split into chunks whose relevant facts are
+extracted concurrently (map) and then merged into one answer (reduce), so
+latency stays roughly flat as tool output grows.
+"""
+
+import asyncio
+import os
+
+from llm.llm_client import ask_llm
+
+MAX_TOOL_OUTPUT_TOKENS = int(os.getenv("MAX_TOOL_OUTPUT_TOKENS", "6000"))
+# Outputs up to this multiple of the budget are trimmed instead of map-reduced
+TRIM_FACTOR = 1.5
+CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+MAX_CONCURRENT_CHUNKS = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "8"))
+MAX_MAP_ROUNDS = 3
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for gpt-4o-mini; ~4 characters per token if tiktoken is unavailable."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def split_into_chunks(text: str, chunk_tokens: int = CHUNK_TOKENS) -> list[str]:
+    """Split on line boundaries into chunks of at most ~``chunk_tokens`` tokens."""
+    chunks, current, size = [], [], 0
+    for line in text.splitlines():
+        tokens = count_tokens(line) + 1
+        if tokens > chunk_tokens:
+            # A single huge line (e.g. minified JSON): cut it by characters
+            step = max(1, len(line) * chunk_tokens // tokens)
+            pieces = [line[i:i + step] for i in range(0, len(line), step)]
+        else:
+            pieces = [line]
+        for piece in pieces:
+            piece_tokens = tokens if len(pieces) == 1 else chunk_tokens
+            if current and size + piece_tokens > chunk_tokens:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += piece_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def trim_to_budget(text: str, budget: int = MAX_TOOL_OUTPUT_TOKENS) -> str:
+    """Keep whole lines from the head (2/3 of the budget) and tail (1/3), noting what was dropped."""
+    lines = text.splitlines()
+    head, tail = [], []
+    head_budget, tail_budget = budget * 2 // 3, budget // 3
+    for line in lines:
+        head_budget -= count_tokens(line) + 1
+        if head_budget < 0:
+            break
+        head.append(line)
+    for line in reversed(lines[len(head):]):
+        tail_budget -= count_tokens(line) + 1
+        if tail_budget < 0:
+            break
+        tail.append(line)
+    omitted = len(lines) - len(head) - len(tail)
+    if omitted <= 0:
+        return text
+    if not head and not tail:
+        # One line larger than the budget: fall back to characters
+        return text[: budget * 4] + "\n[... output truncated ...]"
+    return "\n".join(head + [f"[... {omitted} lines omitted ...]"] + list(reversed(tail)))
+
+
+async def _map_chunks(user_query: str, chunks: list[str]) -> list[str]:
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def extract(i, chunk):
+        async with semaphore:
+            return await ask_llm(
+                f"User asked: {user_query}\n"
+                f"Tool output, part {i} of {len(chunks)}:\n{chunk}\n\n"
+                "List only the facts from this part that help answer the user, keeping names, IDs and numbers exact. "
+                "Reply 'nothing relevant' if there are none."
+            )
+
+    return await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks, 1)))
+
+
+async def summarize_tool_output(user_query: str, tool_output: str) -> str:
+    """Answer ``user_query`` from ``tool_output`` within the token budget."""
+    tokens = count_tokens(tool_output)
+    if tokens > MAX_TOOL_OUTPUT_TOKENS * TRIM_FACTOR:
+        notes = tool_output
+        # Map rounds until the extracted notes fit; each round runs its chunks concurrently
+        for _ in range(MAX_MAP_ROUNDS):
+            if count_tokens(notes) <= MAX_TOOL_OUTPUT_TOKENS:
+                break
+            parts = await _map_chunks(user_query, split_into_chunks(notes))
+            relevant = [p for p in parts if not p.strip().lower().startswith("nothing relevant")]
+            notes = "\n\n".join(relevant) or "Nothing relevant was found in the tool output."
+        tool_output = f"(Notes extracted from a {tokens}-token tool output)\n{trim_to_budget(notes)}"
+    elif tokens > MAX_TOOL_OUTPUT_TOKENS:
+        tool_output = trim_to_budget(tool_output)
+
+    return await ask_llm(
+        f"User asked: {user_query}\n"
+        f"Tool output: {tool_output}\n\n"
+        "Give a clear and helpful response."
+    )
@@ -14,7 +14,7 @@ async def main():
     print("Available tools:", tools)
 
     # Call a tool from DB
-    db_result = await client.call_tool("db.query_tool", {"query": "SELECT * FROM users;"})
+    db_result = await client.call_tool("db.query", {"sql": "SELECT * FROM users;"})
     print("DB result:", db_result)
 
     # Call a tool from Google Drive
@@ -0,0 +1,135 @@
+"""Admission control for FastMCP tools.
+
+Each server has one ``AdmissionController``, and tools can add their own
+tighter limit. A call that finds its limit full waits in a bounded FIFO queue
+for at most ``queue_timeout`` seconds. When the queue is full or the wait runs
+out, the call fails straight away with ``Overloaded`` ("retry after N s")
+instead of piling more work onto the DB pool, Google API threads or SMTP.
+
+    admission = AdmissionController.from_env("DB", max_concurrent=20)
+
+    @mcp.tool()
+    @coalesce
+    @admission.limit(max_concurrent=4)
+    async def query(...): ...
+"""
+
+import asyncio
+import collections
+import functools
+import math
+import os
+import time
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when a server or tool is saturated."""
+
+    def __init__(self, scope: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"{scope} is overloaded, retry after {retry_after}s")
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO wait queue."""
+
+    def __init__(self, scope: str, max_concurrent: int, max_queue: int):
+        self.scope = scope
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters = collections.deque()
+        self._avg_seconds = 1.0  # moving average of how long a slot is held
+
+    def retry_after(self) -> int:
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._avg_seconds * backlog / self.max_concurrent))
+
+    async def acquire(self, timeout: float):
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue or timeout <= 0:
+            raise Overloaded(self.scope, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise Overloaded(self.scope, self.retry_after()) from None
+
+    def release(self, held_seconds: float = None):
+        if held_seconds is not None:
+            self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * held_seconds
+        # Hand the slot straight to the next live waiter, keeping FIFO order
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.queue_timeout = queue_timeout
+        self.server = Limiter(name, max_concurrent, max_queue)
+
+    @classmethod
+    def from_env(cls, prefix: str, max_concurrent: int = 32, max_queue: int = 128, queue_timeout: float = 2.0):
+        """Defaults overridable by ``<PREFIX>_MAX_CONCURRENT`` / ``_MAX_QUEUE`` / ``_QUEUE_TIMEOUT``."""
+        return cls(
+            prefix.lower(),
+            int(os.getenv(f"{prefix}_MAX_CONCURRENT", max_concurrent)),
+            int(os.getenv(f"{prefix}_MAX_QUEUE", max_queue)),
+            float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", queue_timeout)),
+        )
+
+    def limit(self, max_concurrent: int = None, max_queue: int = None):
+        """Admit calls through the server limit and, if given, a per-tool limit."""
+        def decorator(fn):
+            tool = None
+            if max_concurrent is not None:
+                tool = Limiter(
+                    f"{self.name}.{fn.__name__}",
+                    max_concurrent,
+                    max_queue if max_queue is not None else self.server.max_queue,
+                )
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                deadline = time.monotonic() + self.queue_timeout
+                # Tool first: don't hold a server slot while queueing for the tool
+                if tool:
+                    await tool.acquire(deadline - time.monotonic())
+                try:
+                    await self.server.acquire(deadline - time.monotonic())
+                except BaseException:
+                    if tool:
+                        tool.release()
+                    raise
+
+                started = time.monotonic()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    held = time.monotonic() - started
+                    self.server.release(held)
+                    if tool:
+                        tool.release(held)
+
+            return wrapper
+
+        return decorator
@@ -0,0 +1,279 @@
+"""Indexed candidate search on name + "technicalSkills".
+
+Postgres keeps a trigger-maintained ``search_vector`` (GIN, full text) and
+``search_document`` (GIN, pg_trgm) on ``candidates``; SQLite mirrors the table
+into an FTS5 index.
+
+The SQLite index is created on server startup. Postgres schema changes are
+never made by the server: run ``python -m mcp_server.candidate_search`` once
+(it is safe to rerun) and the server only checks that the migration is in place.
+"""
+
+import asyncio
+import logging
+
+from mcp_server.database import connect_database
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = {
+    "search_document": "text",
+    "search_vector": "tsvector",
+}
+
+SEARCH_INDEXES = {
+    "candidates_search_vector_idx": "USING GIN (search_vector)",
+    "candidates_search_document_trgm_idx": "USING GIN (search_document gin_trgm_ops)",
+}
+
+POSTGRES_TRIGGER = [
+    """
+    CREATE OR REPLACE FUNCTION candidates_search_refresh() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_document := lower(coalesce(NEW.name, '') || ' ' || coalesce(NEW."technicalSkills"::text, ''));
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW."technicalSkills"::text, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'candidates_search_refresh') THEN
+            CREATE TRIGGER candidates_search_refresh
+                BEFORE INSERT OR UPDATE OF name, "technicalSkills" ON candidates
+                FOR EACH ROW EXECUTE FUNCTION candidates_search_refresh();
+        END IF;
+    END
+    $$
+    """,
+]
+
+# Rows written before the trigger existed are backfilled in small batches
+BACKFILL_BATCH = 1000
+BACKFILL_SQL = (
+    "UPDATE candidates SET name = name WHERE ctid IN "
+    f"(SELECT ctid FROM candidates WHERE search_vector IS NULL LIMIT {BACKFILL_BATCH})"
+)
+# Fail fast instead of queueing behind (and blocking) live traffic on candidates
+LOCK_TIMEOUT = "5s"
+
+SQLITE_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        "technicalSkills" TEXT
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+        name, "technicalSkills",
+        content='candidates', content_rowid='rowid',
+        tokenize="unicode61 remove_diacritics 2 tokenchars '+#.'",
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS candidates_fts_ai AFTER INSERT ON candidates BEGIN
+        INSERT INTO candidates_fts(rowid, name, "technicalSkills")
+        VALUES (new.rowid, new.name, new."technicalSkills");
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS candidates_fts_ad AFTER DELETE ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, name, "technicalSkills")
+        VALUES ('delete', old.rowid, old.name, old."technicalSkills");
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS candidates_fts_au AFTER UPDATE ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, name, "technicalSkills")
+        VALUES ('delete', old.rowid, old.name, old."technicalSkills");
+        INSERT INTO candidates_fts(rowid, name, "technicalSkills")
+        VALUES (new.rowid, new.name, new."technicalSkills");
+    END
+    """,
+]
+
+MAX_LIMIT = 50
+
+
+async def _missing_columns(db) -> list[str]:
+    rows = await db.query(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'candidates'"
+    )
+    existing = {row["column_name"] for row in rows}
+    return [column for column in SEARCH_COLUMNS if column not in existing]
+
+
+async def _valid_indexes(db) -> set[str]:
+    rows = await db.query(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indisvalid AND c.relname = ANY($1::text[])",
+        list(SEARCH_INDEXES),
+    )
+    return {row["relname"] for row in rows}
+
+
+async def _migrate_postgres(db):
+    await db.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Nullable columns without a default are a catalog-only change, but still
+    # need a brief ACCESS EXCLUSIVE lock, so only take it when a column is missing
+    missing = await _missing_columns(db)
+    async with db.transaction() as conn:
+        await conn.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+        for column in missing:
+            await conn.execute(f"ALTER TABLE candidates ADD COLUMN IF NOT EXISTS {column} {SEARCH_COLUMNS[column]}")
+        for statement in POSTGRES_TRIGGER:
+            await conn.execute(statement)
+
+    while True:
+        status = await db.execute(BACKFILL_SQL)
+        if status.endswith(" 0"):
+            break
+
+    # CONCURRENTLY can't run inside a transaction; each db.execute is autocommit
+    valid = await _valid_indexes(db)
+    for name, definition in SEARCH_INDEXES.items():
+        if name not in valid:
+            # A failed CONCURRENTLY build leaves an invalid index behind
+            await db.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            await db.execute(f"CREATE INDEX CONCURRENTLY {name} ON candidates {definition}")
+
+
+async def _migrate_sqlite(db):
+    existing = await db.query("SELECT name FROM sqlite_master WHERE name = 'candidates_fts'")
+    async with db.transaction() as conn:
+        for statement in SQLITE_MIGRATIONS:
+            await conn.execute(statement)
+        if not existing:
+            await conn.execute("INSERT INTO candidates_fts(candidates_fts) VALUES ('rebuild')")
+
+
+async def migrate(db):
+    """Create the search columns, triggers and indexes for the connected backend (safe to rerun)."""
+    if db.dialect == "sqlite":
+        await _migrate_sqlite(db)
+    else:
+        await _migrate_postgres(db)
+
+
+async def prepare(db):
+    """Get search ready on server startup.
+
+    Returns ``None`` when search can be used, otherwise the reason it can't.
+    SQLite is migrated in place; Postgres is only checked.
+    """
+    try:
+        if db.dialect == "sqlite":
+            await _migrate_sqlite(db)
+            return None
+
+        missing = await _missing_columns(db)
+        trigger = await db.query("SELECT 1 FROM pg_trigger WHERE tgname = 'candidates_search_refresh'")
+        indexes = await _valid_indexes(db)
+    except Exception as e:
+        logger.exception("Could not prepare candidate search")
+        return f"search setup failed ({e})"
+
+    problems = [f"column {c}" for c in missing]
+    problems += [] if trigger else ["trigger candidates_search_refresh"]
+    problems += [f"index {name}" for name in SEARCH_INDEXES if name not in indexes]
+    if problems:
+        logger.warning("Candidate search migration not applied; missing %s", ", ".join(problems))
+        return "the search migration has not been applied (run: python -m mcp_server.candidate_search)"
+    return None
+
+
+def _fts5_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _postgres_search(skills, text, limit, offset):
+    conditions, scores, args = [], [], []
+    if skills:
+        # websearch syntax: '"react" or "node.js"' -> any listed skill matches
+        args.append(" or ".join('"' + s.replace('"', " ") + '"' for s in skills))
+        query = f"websearch_to_tsquery('simple', ${len(args)})"
+        conditions.append(f"search_vector @@ {query}")
+        scores.append(f"ts_rank_cd(search_vector, {query})")
+    if text:
+        args.append(text.lower())
+        conditions.append(f"${len(args)} <% search_document")
+        scores.append(f"word_similarity(${len(args)}, search_document)")
+    args += [limit, offset]
+    sql = (
+        f'SELECT name, email, "technicalSkills", {" + ".join(scores)} AS score '
+        f"FROM candidates WHERE {' AND '.join(conditions)} "
+        f"ORDER BY score DESC, email LIMIT ${len(args) - 1} OFFSET ${len(args)}"
+    )
+    return sql, args
+
+
+def _sqlite_search(skills, text, limit, offset):
+    clauses = []
+    if skills:
+        clauses.append("(" + " OR ".join(_fts5_phrase(s) for s in skills) + ")")
+    if text:
+        clauses.append("(" + " OR ".join(_fts5_phrase(w) + "*" for w in text.split()) + ")")
+    sql = (
+        'SELECT c.name, c.email, c."technicalSkills", -bm25(candidates_fts, 1.0, 2.0) AS score '
+        "FROM candidates_fts JOIN candidates c ON c.rowid = candidates_fts.rowid "
+        "WHERE candidates_fts MATCH $1 "
+        "ORDER BY score DESC, c.email LIMIT $2 OFFSET $3"
+    )
+    return sql, [" AND ".join(clauses), limit, offset]
+
+
+def _parse_cursor(cursor) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = int(cursor)
+    except (TypeError, ValueError):
+        offset = -1
+    if offset < 0:
+        raise ValueError(f"Invalid cursor '{cursor}'; pass the \"Next cursor\" value from a previous search.")
+    return offset
+
+
+async def search(db, skills: list[str] = None, text: str = None, limit: int = 10, cursor: str = None):
+    """Return ``(rows, next_cursor)`` for candidates matching any of ``skills`` and ``text``.
+
+    ``cursor`` is the opaque value returned by the previous page. An invalid
+    cursor, or no non-blank skill or text, raises ``ValueError``.
+    """
+    skills = [s.strip() for s in skills or [] if s and s.strip()]
+    text = (text or "").strip()
+    if not skills and not text:
+        raise ValueError("Provide skills and/or text to search for.")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    offset = _parse_cursor(cursor)
+
+    build = _sqlite_search if db.dialect == "sqlite" else _postgres_search
+    # Fetch one extra row to know whether another page exists
+    sql, args = build(skills, text, limit + 1, offset)
+    rows = await db.query(sql, *args)
+
+    next_cursor = str(offset + limit) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+async def main():
+    db = await connect_database()
+    try:
+        await migrate(db)
+        problem = await prepare(db)
+    finally:
+        await db.disconnect()
+    print(f"❌ {problem}" if problem else "✅ Candidate search is ready")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""Single-flight coalescing for FastMCP tools.
+
+Concurrent calls to the same tool with the same arguments share one in-flight
+upstream request and all receive its result (or exception). Only use it on
+read-only tools: the shared call runs with the first caller's ``Context``.
+
+    @mcp.tool()
+    @coalesce
+    async def list_files(ctx: Context, folder_id: str = None): ...
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+
+from mcp.server.fastmcp import Context
+
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _call_key(fn, signature: inspect.Signature, args, kwargs) -> str:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {name: value for name, value in bound.arguments.items() if not isinstance(value, Context)}
+    return f"{fn.__module__}.{fn.__qualname__}:" + json.dumps(params, sort_keys=True, default=str)
+
+
+def coalesce(fn):
+    """Share one execution of ``fn`` between concurrent calls with identical arguments."""
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = _call_key(fn, signature, args, kwargs)
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the others' result
+        return await asyncio.shield(future)
+
+    return wrapper
@@ -1,44 +1,73 @@
 """Example showing lifespan support for startup/shutdown with strong typing."""
 
+import asyncio
+import datetime
+import decimal
+import os
+import uuid
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
-from mcp_server.database import Database
+from mcp_server import candidate_search, match_index
+from mcp_server.admission import AdmissionController
+from mcp_server.coalesce import coalesce
+from mcp_server.database import Database, QueryRejected, connect_database
 from fastapi.middleware.cors import CORSMiddleware
 @dataclass
 class AppContext:
     """Application context with typed dependencies."""
 
     db: Database
+    match_index: match_index.MatchIndex
+    # Why search_candidates can't run, or None when it can
+    search_unavailable: str | None = None
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     """Manage application lifecycle with type-safe context."""
     # Initialize on startup
-    db = await Database.connect()
+    # DATABASE_URL picks the backend: postgresql://... (asyncpg) or sqlite:///path.db
+    db = await connect_database()
+    search_unavailable = await candidate_search.prepare(db)
+
+    # Local TF-IDF index for match_candidates, kept in sync in the background
+    index = match_index.MatchIndex(os.getenv("MATCH_INDEX_DIR", ".cache/match_index"))
+    # Resume text ingested by the Drive server (same RESUME_TEXT_DIR) is indexed too
+    resumes = match_index.ResumeTexts(os.getenv("RESUME_TEXT_DIR", ".cache/resume_text"))
+    sync = match_index.CandidateSync(db, index, resumes)
+    refresh_task = asyncio.create_task(
+        match_index.refresh_forever(sync, float(os.getenv("MATCH_INDEX_REFRESH_SECONDS", "60")))
+    )
     try:
-        yield AppContext(db=db)
+        yield AppContext(db=db, match_index=index, search_unavailable=search_unavailable)
     finally:
         # Cleanup on shutdown
+        refresh_task.cancel()
         await db.disconnect()
 
 
 # Pass lifespan to server
 mcp = FastMCP("My Database", lifespan=app_lifespan)
 
+admission = AdmissionController.from_env("DB", max_concurrent=20, max_queue=100)
+
 
 # Access type-safe lifespan context in tools
 @mcp.tool()
+@coalesce
+@admission.limit()
 async def get_users(ctx: Context[ServerSession, AppContext]):
     """Get first 5 users from PostgreSQL."""
     rows = await ctx.request_context.lifespan_context.db.query("SELECT id, email FROM users LIMIT 5;")
     return ", ".join([row["email"] for row in rows])
 
 @mcp.tool()
+@coalesce
+@admission.limit()
 async def get_candidate_info(ctx: Context[ServerSession, dict]):
     """
     Fetch candidate information (name, email, and technical skills).
@@ -56,6 +85,120 @@ async def get_candidate_info(ctx: Context[ServerSession, dict]):
     return "\n".join(candidates)
 
 
+@mcp.tool()
+@coalesce
+@admission.limit()
+async def get_candidate_by_email(ctx: Context[ServerSession, AppContext], email: str):
+    """
+    Fetch one candidate's information (name, email, and technical skills) by email.
+    """
+    rows = await ctx.request_context.lifespan_context.db.query(
+        "SELECT name, email, \"technicalSkills\" FROM candidates WHERE email = $1;", email
+    )
+    if not rows:
+        return f"No candidate found with email {email}."
+
+    row = rows[0]
+    return f"Name: {row['name']}, Email: {row['email']}, Skills: {row['technicalSkills']}"
+
+
+@mcp.tool()
+@coalesce
+@admission.limit()
+async def search_candidates(
+    ctx: Context[ServerSession, AppContext],
+    skills: list[str] = None,
+    text: str = None,
+    limit: int = 10,
+    cursor: str = None,
+):
+    """
+    Search candidates by technical skills and/or free text over name and skills, best matches first.
+    :param skills: skills to look for, e.g. ["React", "Node.js"]; candidates with more matches rank higher
+    :param text: free text matched against name and skills, e.g. "alice" or "frontend"
+    :param limit: number of candidates to return (max 50)
+    :param cursor: value of "Next cursor" from a previous call to fetch the next page
+    """
+    app = ctx.request_context.lifespan_context
+    if app.search_unavailable:
+        return f"Candidate search is unavailable: {app.search_unavailable}."
+
+    try:
+        rows, next_cursor = await candidate_search.search(app.db, skills, text, limit, cursor)
+    except ValueError as e:
+        return str(e)
+    if not rows:
+        return "No matching candidates found."
+
+    candidates = [
+        f"Name: {row['name']}, Email: {row['email']}, Skills: {row['technicalSkills']}, Score: {row['score']:.3f}"
+        for row in rows
+    ]
+    if next_cursor:
+        candidates.append(f"Next cursor: {next_cursor}")
+    return "\n".join(candidates)
+
+
+@mcp.tool()
+@coalesce
+@admission.limit(max_concurrent=8)
+async def match_candidates(ctx: Context[ServerSession, AppContext], job_description: str, top_k: int = 10):
+    """
+    Rank candidates against a job description by similarity to their skills and resume text, best matches first.
+    :param job_description: job description or list of required skills
+    :param top_k: number of candidates to return
+    """
+    index = ctx.request_context.lifespan_context.match_index
+    matches = await asyncio.to_thread(index.search, job_description, max(1, min(top_k, 100)))
+    if not matches:
+        return "No matching candidates found."
+
+    return "\n".join(
+        f"Name: {row['name']}, Email: {row['key']}, Skills: {row['skills']}, Score: {score:.3f}"
+        for score, row in matches
+    )
+
+
+# Limits for the ad-hoc query tool
+QUERY_TIMEOUT_MS = int(os.getenv("QUERY_TIMEOUT_MS", "5000"))
+QUERY_MAX_COST = float(os.getenv("QUERY_MAX_COST", "100000"))
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "200"))
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.date, datetime.time, decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return value
+
+
+@mcp.tool()
+@coalesce
+@admission.limit(max_concurrent=4, max_queue=16)
+async def query(ctx: Context[ServerSession, AppContext], sql: str, max_rows: int = 50):
+    """
+    Run a read-only SQL query (single SELECT/WITH statement) for ad-hoc questions.
+    Expensive or slow queries are rejected, so filter and aggregate in SQL rather than fetching whole tables.
+    :param sql: the SELECT statement, e.g. SELECT count(*) FROM candidates
+    :param max_rows: maximum number of rows to return
+    """
+    try:
+        result = await ctx.request_context.lifespan_context.db.guarded_query(
+            sql,
+            max_rows=max(1, min(max_rows, QUERY_MAX_ROWS)),
+            timeout_ms=QUERY_TIMEOUT_MS,
+            max_cost=QUERY_MAX_COST,
+        )
+    except QueryRejected as e:
+        return f"Query rejected: {e}"
+    except Exception as e:
+        return f"Query failed: {e}"
+
+    result["rows"] = [[_json_value(v) for v in row] for row in result["rows"]]
+    return result
+
+
 # Run server with streamable_http transport
 # if __name__ == "__main__":
 #     mcp.run(transport="streamable-http")
@@ -0,0 +1,186 @@
+"""Resume text ingestion from Google Drive.
+
+Files are streamed to a temp file in chunks, text is extracted in a process
+pool, and results are stored on disk keyed by file id + ``modifiedTime`` so an
+unchanged file is never downloaded or parsed twice.
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+
+from googleapiclient.http import MediaIoBaseDownload
+
+from mcp_server import google_services
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_DOC = "application/vnd.google-apps.document"
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT = "text/plain"
+SUPPORTED_MIME_TYPES = {GOOGLE_DOC, PDF, DOCX, TEXT}
+
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+FILE_FIELDS = "id, name, mimeType, modifiedTime"
+
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+# --- Text extraction (runs in worker processes) ---
+
+def extract_text(path: str, mime_type: str) -> str:
+    """Extract plain text from a downloaded file."""
+    if mime_type == PDF:
+        return _pdf_text(path)
+    if mime_type == DOCX:
+        return _docx_text(path)
+    # Google Docs are exported as text/plain already
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _pdf_text(path: str) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _docx_text(path: str) -> str:
+    paragraphs = []
+    with zipfile.ZipFile(path) as zf, zf.open("word/document.xml") as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == _DOCX_NS + "p":
+                paragraphs.append("".join(t.text or "" for t in element.iter(_DOCX_NS + "t")))
+                element.clear()
+    return "\n".join(p for p in paragraphs if p)
+
+
+# --- Storage ---
+
+class TextStore:
+    """Extracted text on disk, one ``<file_id>@<modifiedTime>.txt`` per file.
+
+    Methods do blocking file I/O; async callers run them with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, file_id: str, modified_time: str) -> str:
+        return os.path.join(self.root, f"{file_id}@{modified_time.replace(':', '-')}.txt")
+
+    def has(self, file_id: str, modified_time: str) -> bool:
+        return os.path.exists(self._path(file_id, modified_time))
+
+    def get(self, file_id: str, modified_time: str):
+        try:
+            with open(self._path(file_id, modified_time), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, file_id: str, modified_time: str, text: str):
+        path = self._path(file_id, modified_time)
+        for stale in glob.glob(os.path.join(self.root, glob.escape(file_id) + "@*.txt")):
+            if stale != path:
+                os.unlink(stale)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+# --- Drive access ---
+
+async def get_file(file_id: str) -> dict:
+    return await google_services.execute(
+        "drive", "v3", lambda drive: drive.files().get(fileId=file_id, fields=FILE_FIELDS)
+    )
+
+
+async def list_folder(folder_id: str) -> list[dict]:
+    """List every non-trashed file in a folder, following pagination."""
+    files, page_token = [], None
+    while True:
+        results = await google_services.execute(
+            "drive",
+            "v3",
+            lambda drive: drive.files().list(
+                q=f"'{folder_id}' in parents and trashed = false",
+                pageSize=1000,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+            ),
+        )
+        files.extend(results.get("files", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return files
+
+
+def download_to_file(file: dict, fh):
+    """Stream a file's content (Google Docs as a text/plain export) into ``fh``. Blocking."""
+    google_services.ensure_token(google_services.DRIVE_READONLY)
+    drive = google_services.service("drive", "v3")
+    if file["mimeType"] == GOOGLE_DOC:
+        request = drive.files().export_media(fileId=file["id"], mimeType=TEXT)
+    else:
+        request = drive.files().get_media(fileId=file["id"])
+
+    downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk(num_retries=3)
+
+
+# --- Pipeline ---
+
+async def fetch_text(store: TextStore, pool, file: dict) -> str:
+    """Return the text of ``file`` from the store, downloading and extracting it if stale."""
+    cached = await asyncio.to_thread(store.get, file["id"], file["modifiedTime"])
+    if cached is not None:
+        return cached
+
+    fd, path = tempfile.mkstemp(prefix="drive-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            await asyncio.to_thread(download_to_file, file, fh)
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(pool, extract_text, path, file["mimeType"])
+    finally:
+        os.unlink(path)
+
+    await asyncio.to_thread(store.put, file["id"], file["modifiedTime"], text)
+    return text
+
+
+async def ingest_folder(store: TextStore, pool, folder_id: str, concurrency: int = 4) -> dict:
+    """Bring the store up to date with every supported file in ``folder_id``."""
+    files = await list_folder(folder_id)
+    semaphore = asyncio.Semaphore(concurrency)
+    summary = {"ingested": [], "unchanged": 0, "unsupported": [], "failed": []}
+
+    async def ingest(file):
+        if file["mimeType"] not in SUPPORTED_MIME_TYPES:
+            summary["unsupported"].append(file["name"])
+            return
+        if await asyncio.to_thread(store.has, file["id"], file["modifiedTime"]):
+            summary["unchanged"] += 1
+            return
+        async with semaphore:
+            try:
+                await fetch_text(store, pool, file)
+                summary["ingested"].append(file["name"])
+            except Exception as e:
+                logger.exception("Failed to ingest %s (%s)", file["name"], file["id"])
+                summary["failed"].append(f"{file['name']}: {e}")
+
+    await asyncio.gather(*(ingest(f) for f in files))
+    return summary
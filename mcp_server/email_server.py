@@ -1,10 +1,12 @@
 # email_mcp_server.py
+import asyncio
 import logging
 from typing import Optional
 from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP
 from mcp.types import TextContent
+from mcp_server.admission import AdmissionController
 from mcp_server.email_service import EmailService  # <-- your class in email_service.py
 
 logger = logging.getLogger(__name__)
@@ -23,7 +25,10 @@ async def app_lifespan(app):
 # Attach lifespan to FastMCP
 mcp = FastMCP("email-server", lifespan=app_lifespan)
 
+admission = AdmissionController.from_env("EMAIL", max_concurrent=4, max_queue=20, queue_timeout=5.0)
+
 @mcp.tool()
+@admission.limit()
 async def send_email(
     to_email: str,
     subject: str,
@@ -31,10 +36,11 @@ async def send_email(
     html_body: Optional[str] = None,
 ):
     try:
+        # smtplib blocks; run it off the event loop so the admission limit is real concurrency
         if html_body is None:
-            success = email_service.send_email(to_email, subject, body)
+            success = await asyncio.to_thread(email_service.send_email, to_email, subject, body)
         else:
-            success = email_service.send_email(to_email, subject, body, html_body)
+            success = await asyncio.to_thread(email_service.send_email, to_email, subject, body, html_body)
 
         if success:
             return [TextContent(type="text", text=f"✅ Email sent successfully to {to_email}")]
@@ -5,16 +5,17 @@ Example MCP server for Google Sheets integration with lifespan support.
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-import json
 import os
 from typing import Any
 
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
+from mcp_server.admission import AdmissionController
+from mcp_server.coalesce import coalesce
 
 # Google API
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+from mcp_server import google_services
+from mcp_server.sheet_mirror import SheetMirror
 
 # Load environment variables from a .env file
 from dotenv import load_dotenv
@@ -23,26 +24,26 @@ load_dotenv()
 
 @dataclass
 class AppContext:
-    """Application context with typed Google Sheets client."""
+    """Application context; the Sheets client itself comes from google_services."""
 
-    sheets_service: Any
+    sheet_mirror: SheetMirror
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
-    """Setup Google Sheets client on startup and cleanup on shutdown."""
-    SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets"
-]
-    # Use Service Account JSON credentials
-    # Load credentials JSON from .env
-    creds_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
-
-    creds = Credentials.from_service_account_info(creds_info, scopes=SCOPES)
-    sheets_service = build("sheets", "v4", credentials=creds)
+    """Check Google credentials on startup; the Sheets client is built lazily per worker thread."""
+    google_services.credentials(google_services.SPREADSHEETS)
+
+    # Local copy of the sheet for query_sheet, synced on demand
+    sheet_mirror = SheetMirror(
+        SPREADSHEET_ID,
+        os.getenv("SHEET_MIRROR_RANGE", "Sheet1"),
+        index_columns=os.getenv("SHEET_INDEX_COLUMNS", "email").split(","),
+        check_interval=float(os.getenv("SHEET_MIRROR_CHECK_SECONDS", "15")),
+    )
 
     try:
-        yield AppContext(sheets_service=sheets_service)
+        yield AppContext(sheet_mirror=sheet_mirror)
     finally:
         # No explicit close method, but clean up if needed
         pass
@@ -51,47 +52,52 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
 # Init MCP with lifespan
 mcp = FastMCP("Google Sheets MCP", lifespan=app_lifespan)
 
+admission = AdmissionController.from_env("SHEETS", max_concurrent=8, max_queue=50)
+
 # Replace with your Sheet ID
 SPREADSHEET_ID = "1bPLfgh4jUo0rPK9M-X3H-cDOTaqs4W2eslBbnP6SkIw"
 
 
 @mcp.tool()
+@coalesce
+@admission.limit()
 async def read_sheet(ctx: Context[ServerSession, AppContext], range_: str = "Sheet1!A:D"):
     """
     Read a range of values from the Google Sheet.
     :param range_: A1 notation range (e.g., "Users!A:D")
     """
-    result = (
-        ctx.request_context.lifespan_context.sheets_service.spreadsheets()
-        .values()
-        .get(spreadsheetId=SPREADSHEET_ID, range=range_)
-        .execute()
+    result = await google_services.execute(
+        "sheets", "v4", lambda sheets: sheets.spreadsheets().values().get(spreadsheetId=SPREADSHEET_ID, range=range_)
     )
     return result.get("values", [])
 
 
 @mcp.tool()
+@admission.limit(max_concurrent=2)
 async def append_row(ctx: Context[ServerSession, AppContext], values: list[str]):
     """
     Append a new row to the Google Sheet.
     :param values: list of cell values, e.g. ["John Doe", "john@example.com", "Software Developer"]
     """
     body = {"values": [values]}
-    result = (
-        ctx.request_context.lifespan_context.sheets_service.spreadsheets()
-        .values()
-        .append(
-            spreadsheetId=SPREADSHEET_ID,
-            range="Sheet1!A1:D10",
-            valueInputOption="RAW",
-            body=body,
-        )
-        .execute()
+    result = await ctx.request_context.lifespan_context.sheet_mirror.append_row(
+        values,
+        lambda: google_services.execute(
+            "sheets",
+            "v4",
+            lambda sheets: sheets.spreadsheets().values().append(
+                spreadsheetId=SPREADSHEET_ID,
+                range="Sheet1!A1:D10",
+                valueInputOption="RAW",
+                body=body,
+            ),
+        ),
     )
     return {"updates": result}
 
 
 @mcp.tool()
+@admission.limit(max_concurrent=2)
 async def update_cell(ctx: Context[ServerSession, AppContext], range_: str, value: str):
     """
     Update a specific cell in the Google Sheet.
@@ -99,19 +105,45 @@ async def update_cell(ctx: Context[ServerSession, AppContext], range_: str, valu
     :param value: New value for the cell
     """
     body = {"values": [[value]]}
-    result = (
-        ctx.request_context.lifespan_context.sheets_service.spreadsheets()
-        .values()
-        .update(
-            spreadsheetId=SPREADSHEET_ID,
-            range=range_,
-            valueInputOption="RAW",
-            body=body,
-        )
-        .execute()
+    result = await ctx.request_context.lifespan_context.sheet_mirror.write(
+        lambda: google_services.execute(
+            "sheets",
+            "v4",
+            lambda sheets: sheets.spreadsheets().values().update(
+                spreadsheetId=SPREADSHEET_ID,
+                range=range_,
+                valueInputOption="RAW",
+                body=body,
+            ),
+        ),
     )
     return {"updated": result}
 
+
+@mcp.tool()
+@admission.limit()
+async def query_sheet(
+    ctx: Context[ServerSession, AppContext],
+    columns: list[str] = None,
+    where: dict[str, Any] = None,
+    order_by: str = None,
+    limit: int = 50,
+):
+    """
+    Query the Google Sheet by header names and return only the matching rows.
+    :param columns: header names to return, e.g. ["Name", "Email"]; all columns if omitted
+    :param where: conditions ANDed together, e.g. {"Email": "john@example.com"} or {"Score": {"gte": 7}};
+                  operators: eq, ne, lt, lte, gt, gte, contains (text columns), in (list of values)
+    :param order_by: header name to sort by, prefix with "-" for descending, e.g. "-Score"
+    :param limit: maximum number of rows to return
+    """
+    mirror = ctx.request_context.lifespan_context.sheet_mirror
+    await mirror.refresh()
+    try:
+        return mirror.query(columns, where, order_by, max(1, limit))
+    except ValueError as e:
+        return str(e)
+
 # --- Expose as ASGI app ---
 app = mcp.streamable_http_app()
 
@@ -2,23 +2,19 @@
 Example MCP server for Google Drive integration with lifespan support + CORS.
 """
 
-import base64
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-import io
-import json
+import multiprocessing
 import os
-import asyncio
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
 
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
 
-# Google API
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+from mcp_server import drive_ingest, google_services
+from mcp_server.admission import AdmissionController
+from mcp_server.coalesce import coalesce
 
 # Load environment variables from a .env file
 from dotenv import load_dotenv
@@ -30,36 +26,43 @@ from fastapi.middleware.cors import CORSMiddleware
 
 @dataclass
 class AppContext:
-    """Application context with typed Google Drive client."""
-    drive_service: Any
+    """Application context; the Drive client itself comes from google_services."""
+    text_store: drive_ingest.TextStore
+    extract_pool: ProcessPoolExecutor
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
-    """Setup Google Drive client on startup and cleanup on shutdown."""
-
-    SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
-
-    # Load credentials JSON from .env
-    creds_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
-
-    # Use service account info (dict, not file)
-    creds = Credentials.from_service_account_info(creds_info, scopes=SCOPES)
-
-    drive_service = build("drive", "v3", credentials=creds)
+    """Setup Google Drive dependencies on startup and cleanup on shutdown."""
+
+    # Parse GOOGLE_CREDENTIALS now so bad config fails at startup; the Drive
+    # client is built lazily per worker thread from the bundled discovery doc
+    google_services.credentials(google_services.DRIVE_READONLY)
+
+    # Extracted resume text, keyed by file id + modifiedTime
+    text_store = drive_ingest.TextStore(os.getenv("RESUME_TEXT_DIR", ".cache/resume_text"))
+    # Workers start lazily, after Google API threads exist; forking then could
+    # copy a held lock, so start them from a clean forkserver process instead
+    extract_pool = ProcessPoolExecutor(
+        max_workers=int(os.getenv("TEXT_EXTRACT_WORKERS", os.cpu_count() or 2)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    )
 
     try:
-        yield AppContext(drive_service=drive_service)
+        yield AppContext(text_store=text_store, extract_pool=extract_pool)
     finally:
-        # googleapiclient build() doesn't require explicit close
-        pass
+        extract_pool.shutdown(cancel_futures=True)
 
 
 # Init MCP with lifespan
 mcp = FastMCP("Google Drive MCP", lifespan=app_lifespan)
 
+admission = AdmissionController.from_env("GDRIVE", max_concurrent=16, max_queue=64)
+
 
 @mcp.tool()
+@coalesce
+@admission.limit()
 async def list_files(ctx: Context[ServerSession, AppContext], folder_id: str = None, limit: int = 10):
     """
     List files from Google Drive.
@@ -68,14 +71,14 @@ async def list_files(ctx: Context[ServerSession, AppContext], folder_id: str = N
     """
     query = f"'{folder_id}' in parents" if folder_id else None
 
-    results = (
-        ctx.request_context.lifespan_context.drive_service.files()
-        .list(
+    results = await google_services.execute(
+        "drive",
+        "v3",
+        lambda drive: drive.files().list(
             q=query,
             pageSize=limit,
             fields="files(id, name, mimeType, modifiedTime)",
-        )
-        .execute()
+        ),
     )
 
     files = results.get("files", [])
@@ -88,6 +91,8 @@ async def list_files(ctx: Context[ServerSession, AppContext], folder_id: str = N
 
 
 @mcp.tool()
+@coalesce
+@admission.limit()
 async def search_files(ctx: Context[ServerSession, AppContext], query: str, folder_id: str = None):
     """
     Search files in Google Drive by name.
@@ -98,10 +103,8 @@ async def search_files(ctx: Context[ServerSession, AppContext], query: str, fold
     if folder_id:
         q += f" and '{folder_id}' in parents"
 
-    results = (
-        ctx.request_context.lifespan_context.drive_service.files()
-        .list(q=q, fields="files(id, name, mimeType, modifiedTime)")
-        .execute()
+    results = await google_services.execute(
+        "drive", "v3", lambda drive: drive.files().list(q=q, fields="files(id, name, mimeType, modifiedTime)")
     )
 
     files = results.get("files", [])
@@ -114,17 +117,19 @@ async def search_files(ctx: Context[ServerSession, AppContext], query: str, fold
 
 
 @mcp.tool()
+@coalesce
+@admission.limit()
 async def get_file_metadata(ctx: Context[ServerSession, AppContext], file_id: str):
     """
     Fetch metadata for a specific file.
     """
-    file = (
-        ctx.request_context.lifespan_context.drive_service.files()
-        .get(
+    file = await google_services.execute(
+        "drive",
+        "v3",
+        lambda drive: drive.files().get(
             fileId=file_id,
             fields="id, name, mimeType, size, createdTime, owners, modifiedTime",
-        )
-        .execute()
+        ),
     )
 
     return {
@@ -138,6 +143,45 @@ async def get_file_metadata(ctx: Context[ServerSession, AppContext], file_id: st
     }
 
 
+@mcp.tool()
+@coalesce
+@admission.limit(max_concurrent=8)
+async def fetch_file_text(ctx: Context[ServerSession, AppContext], file_id: str, max_chars: int = 20000):
+    """
+    Fetch the plain text of a resume (PDF, DOCX, Google Doc or text file).
+    :param file_id: ID of the Google Drive file
+    :param max_chars: truncate the returned text to this many characters
+    """
+    app = ctx.request_context.lifespan_context
+    file = await drive_ingest.get_file(file_id)
+    if file["mimeType"] not in drive_ingest.SUPPORTED_MIME_TYPES:
+        return f"Unsupported file type for '{file['name']}': {file['mimeType']}"
+
+    text = await drive_ingest.fetch_text(app.text_store, app.extract_pool, file)
+    if len(text) > max_chars:
+        return text[:max_chars] + f"\n... [truncated, {len(text)} characters total]"
+    return text
+
+
+@mcp.tool()
+@coalesce
+@admission.limit(max_concurrent=1, max_queue=2)
+async def ingest_folder(ctx: Context[ServerSession, AppContext], folder_id: str, concurrency: int = 4):
+    """
+    Download and extract text from every resume in a folder. Files unchanged since the last run are skipped.
+    :param folder_id: ID of the Google Drive folder
+    :param concurrency: number of files downloaded at once
+    """
+    app = ctx.request_context.lifespan_context
+    summary = await drive_ingest.ingest_folder(app.text_store, app.extract_pool, folder_id, max(1, concurrency))
+    return {
+        "ingested": len(summary["ingested"]),
+        "unchanged": summary["unchanged"],
+        "unsupported": len(summary["unsupported"]),
+        "failed": summary["failed"],
+    }
+
+
 # --- Expose as ASGI app with CORS ---
 app = mcp.streamable_http_app()
 
@@ -0,0 +1,91 @@
+"""Shared Google API access for the Drive and Sheets servers.
+
+Credentials are cached per scope set within a process, so each API keeps the
+scopes it had before (read-only Drive, read-write Sheets) and concurrent
+requests reuse one access token instead of each fetching their own. Each
+server runs as its own process and holds its own tokens. Clients are built
+lazily from the discovery documents bundled with google-api-python-client, so
+startup needs no network. Each worker thread gets its own client and
+keep-alive ``httplib2`` connection, because ``httplib2`` is not thread-safe.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+
+import httplib2
+from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp, Request
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+DRIVE_READONLY = ("https://www.googleapis.com/auth/drive.readonly",)
+DRIVE_METADATA_READONLY = ("https://www.googleapis.com/auth/drive.metadata.readonly",)
+SPREADSHEETS = ("https://www.googleapis.com/auth/spreadsheets",)
+
+# Scopes used for an API unless a call asks for narrower ones
+API_SCOPES = {
+    "drive": DRIVE_READONLY,
+    "sheets": SPREADSHEETS,
+}
+
+HTTP_TIMEOUT = 60
+
+_local = threading.local()
+_refresh_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def credentials(scopes: tuple) -> Credentials:
+    """Service account credentials for ``scopes`` from the ``GOOGLE_CREDENTIALS`` JSON env var."""
+    creds_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
+    return Credentials.from_service_account_info(creds_info, scopes=list(scopes))
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document(api: str, version: str) -> str:
+    return discovery_cache.get_static_doc(api, version)
+
+
+def ensure_token(scopes: tuple):
+    """Refresh the shared access token once, instead of every thread racing to fetch its own."""
+    creds = credentials(scopes)
+    if creds.valid:
+        return
+    with _refresh_lock:
+        if not creds.valid:
+            creds.refresh(Request(httplib2.Http(timeout=HTTP_TIMEOUT)))
+
+
+def authorized_http(scopes: tuple) -> AuthorizedHttp:
+    """This thread's authorized HTTP connection for ``scopes``."""
+    https = _local.__dict__.setdefault("https", {})
+    if scopes not in https:
+        https[scopes] = AuthorizedHttp(credentials(scopes), http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    return https[scopes]
+
+
+def service(api: str, version: str, scopes: tuple = None):
+    """This thread's client for ``api``/``version``, built on first use."""
+    scopes = scopes or API_SCOPES[api]
+    services = _local.__dict__.setdefault("services", {})
+    key = (api, version, scopes)
+    if key not in services:
+        services[key] = build_from_document(_discovery_document(api, version), http=authorized_http(scopes))
+    return services[key]
+
+
+async def execute(api: str, version: str, build_request, scopes: tuple = None):
+    """Run ``build_request(client).execute()`` on a worker thread.
+
+    e.g. ``await execute("drive", "v3", lambda drive: drive.files().get(fileId=file_id))``
+    """
+    scopes = scopes or API_SCOPES[api]
+
+    def run():
+        ensure_token(scopes)
+        return build_request(service(api, version, scopes)).execute()
+
+    return await asyncio.to_thread(run)
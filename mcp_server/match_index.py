@@ -0,0 +1,362 @@
+"""Local candidate-to-job matching over hashed TF-IDF vectors.
+
+Candidate text (name, skills and any ingested resume text) is hashed into
+fixed-width n-gram vectors (no vocabulary, no network) stored in a memory-mapped ``.npy`` matrix. Rows are rewritten only
+when a candidate's text changes; queries are blocked cosine similarity with
+``argpartition`` top-k selection.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 4096
+INITIAL_CAPACITY = 1024
+BLOCK_ROWS = 8192
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def vectorize(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Signed-hash unigrams + bigrams of ``text`` into a sublinear-TF vector."""
+    tokens = [t.rstrip(".") for t in _TOKEN_RE.findall(text.lower())]
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    vec = np.zeros(dim, dtype=np.float32)
+    for feature, tf in features.items():
+        h = zlib.crc32(feature.encode())
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vec[h % dim] += sign * (1.0 + math.log(tf))
+    return vec
+
+
+class MatchIndex:
+    """Memory-mapped matrix of candidate vectors plus a JSON row table."""
+
+    def __init__(self, root: str, dim: int = DEFAULT_DIM):
+        os.makedirs(root, exist_ok=True)
+        self.dim = dim
+        self._vectors_path = os.path.join(root, "vectors.npy")
+        self._meta_path = os.path.join(root, "rows.json")
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        self.rows = []
+        self.vectors = None
+        if os.path.exists(self._meta_path) and os.path.exists(self._vectors_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("dim") == self.dim:
+                self.rows = meta["rows"]
+                self.vectors = open_memmap(self._vectors_path, mode="r+")
+        if self.vectors is None:
+            self.vectors = open_memmap(
+                self._vectors_path, mode="w+", dtype=np.float32, shape=(INITIAL_CAPACITY, self.dim)
+            )
+
+        self._slots = {row["key"]: i for i, row in enumerate(self.rows) if row}
+        self._free = [i for i, row in enumerate(self.rows) if row is None]
+        self._df = np.zeros(self.dim, dtype=np.int64)
+        n = len(self.rows)
+        for start in range(0, n, BLOCK_ROWS):
+            self._df += (self.vectors[start:min(start + BLOCK_ROWS, n)] != 0).sum(axis=0)
+        self._dirty = True
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _grow(self):
+        capacity = self.vectors.shape[0] * 2
+        tmp_path = self._vectors_path + ".tmp"
+        grown = open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+        grown[: self.vectors.shape[0]] = self.vectors
+        grown.flush()
+        del grown
+        del self.vectors
+        os.replace(tmp_path, self._vectors_path)
+        self.vectors = open_memmap(self._vectors_path, mode="r+")
+
+    def upsert(self, key: str, text: str, info: dict) -> bool:
+        """Insert or refresh one candidate. Returns False if its text is unchanged."""
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None and self.rows[slot]["hash"] == digest:
+                return False
+
+            vec = vectorize(text, self.dim)
+            if slot is not None:
+                self._df -= self.vectors[slot] != 0
+            elif self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self.rows)
+                if slot >= self.vectors.shape[0]:
+                    self._grow()
+                self.rows.append(None)
+
+            self.vectors[slot] = vec
+            self._df += vec != 0
+            self.rows[slot] = {"key": key, "hash": digest, **info}
+            self._slots[key] = slot
+            self._dirty = True
+            return True
+
+    def remove(self, key: str):
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                return
+            self._df -= self.vectors[slot] != 0
+            self.vectors[slot] = 0
+            self.rows[slot] = None
+            self._free.append(slot)
+            self._dirty = True
+
+    def sync(self, candidates) -> dict:
+        """Make the index match ``candidates`` (iterable of ``(key, text, info)``) and persist it."""
+        with self._lock:
+            seen, updated = set(), 0
+            for key, text, info in candidates:
+                seen.add(key)
+                updated += self.upsert(key, text, info)
+            stale = [key for key in self._slots if key not in seen]
+            for key in stale:
+                self.remove(key)
+            if updated or stale:
+                self.save()
+            return {"updated": updated, "removed": len(stale), "total": len(self)}
+
+    def update(self, candidates) -> dict:
+        """Upsert ``candidates`` (iterable of ``(key, text, info)``) without removing others, and persist."""
+        with self._lock:
+            updated = sum(self.upsert(key, text, info) for key, text, info in candidates)
+            if updated:
+                self.save()
+            return {"updated": updated, "removed": 0, "total": len(self)}
+
+    def row(self, key: str):
+        with self._lock:
+            slot = self._slots.get(key)
+            return None if slot is None else self.rows[slot]
+
+    def save(self):
+        with self._lock:
+            self.vectors.flush()
+            tmp_path = self._meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "rows": self.rows}, f)
+            os.replace(tmp_path, self._meta_path)
+
+    def _refresh_weights(self):
+        # cos(x, q) with idf weighting = x . (q * idf^2) / (|x * idf| |q * idf|)
+        n = max(len(self), 1)
+        idf = np.log((1.0 + n) / (1.0 + self._df)) + 1.0
+        self._idf_sq = (idf * idf).astype(np.float32)
+        rows = len(self.rows)
+        norms = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, BLOCK_ROWS):
+            block = self.vectors[start:min(start + BLOCK_ROWS, rows)]
+            norms[start:start + len(block)] = np.sqrt(np.square(block) @ self._idf_sq)
+        norms[norms == 0] = np.inf  # empty/free rows score 0
+        self._norms = norms
+        self._dirty = False
+
+    def search(self, text: str, top_k: int = 10) -> list[tuple[float, dict]]:
+        """Return up to ``top_k`` ``(score, row)`` pairs ranked by cosine similarity."""
+        with self._lock:
+            n = len(self.rows)
+            if not n or top_k <= 0:
+                return []
+            if self._dirty:
+                self._refresh_weights()
+
+            q = vectorize(text, self.dim)
+            q_norm = float(np.sqrt(np.square(q) @ self._idf_sq))
+            if q_norm == 0:
+                return []
+            q_weighted = q * self._idf_sq / q_norm
+
+            best_scores, best_slots = [], []
+            for start in range(0, n, BLOCK_ROWS):
+                block = self.vectors[start:min(start + BLOCK_ROWS, n)]
+                scores = (block @ q_weighted) / self._norms[start:start + len(block)]
+                k = min(top_k, len(scores))
+                top = np.argpartition(-scores, k - 1)[:k]
+                best_scores.append(scores[top])
+                best_slots.append(top + start)
+
+            scores = np.concatenate(best_scores)
+            slots = np.concatenate(best_slots)
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.rows[slots[i]]) for i in top if scores[i] > 0]
+
+
+# Timestamp columns used as a sync watermark, in order of preference
+UPDATED_AT_COLUMNS = ("updatedAt", "updated_at")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+class ResumeTexts:
+    """Resume text extracted by the Drive server, linked to candidates by email.
+
+    Reads the ``drive_ingest.TextStore`` directory. A file's name changes with
+    its Drive ``modifiedTime``, so only new names are read. A resume belongs to
+    every candidate whose email address appears in it. A candidate's text is
+    read once and cached until ``refresh`` sees one of their files change.
+    Blocking.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._emails = {}  # file name -> emails found in it
+        self._files = {}  # email -> file names
+        self._texts = {}  # email -> cached resume text
+
+    def refresh(self) -> set[str]:
+        """Rescan the store; return emails whose resume text was added, changed or removed."""
+        try:
+            names = {name for name in os.listdir(self.root) if name.endswith(".txt")}
+        except FileNotFoundError:
+            names = set()
+
+        changed = set()
+        for name in self._emails.keys() - names:
+            for email in self._emails.pop(name):
+                self._files[email].discard(name)
+                changed.add(email)
+        for name in names - self._emails.keys():
+            try:
+                with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                    emails = {e.lower().rstrip(".") for e in _EMAIL_RE.findall(f.read())}
+            except FileNotFoundError:
+                continue  # replaced by a newer version mid-scan
+            self._emails[name] = emails
+            for email in emails:
+                self._files.setdefault(email, set()).add(name)
+            changed |= emails
+        for email in changed:
+            self._texts.pop(email, None)
+        return changed
+
+    def text(self, email: str) -> str:
+        email = email.lower()
+        cached = self._texts.get(email)
+        if cached is not None:
+            return cached
+        parts = []
+        for name in sorted(self._files.get(email, ())):
+            try:
+                with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                    parts.append(f.read())
+            except FileNotFoundError:
+                pass  # replaced since the last refresh, which will invalidate this entry
+        text = self._texts[email] = "\n".join(parts)
+        return text
+
+
+async def _updated_at_column(db):
+    if db.dialect == "sqlite":
+        rows = await db.query("SELECT name AS column_name FROM pragma_table_info('candidates')")
+    else:
+        rows = await db.query(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'candidates'"
+        )
+    columns = {row["column_name"] for row in rows}
+    return next((c for c in UPDATED_AT_COLUMNS if c in columns), None)
+
+
+class CandidateSync:
+    """Keeps a ``MatchIndex`` in step with the candidates table and resume texts.
+
+    When the table has an ``updatedAt``/``updated_at`` column, a run reads only
+    rows changed since the previous run, and every ``reconcile_every`` runs read
+    the whole table to drop deleted candidates and catch late commits. Without
+    such a column every run reads the whole table.
+    """
+
+    def __init__(self, db, index: MatchIndex, resumes: ResumeTexts = None, reconcile_every: int = 10):
+        self.db = db
+        self.index = index
+        self.resumes = resumes
+        self.reconcile_every = reconcile_every
+        self._column = None
+        self._watermark = None
+        self._runs = 0
+        self._keys = {}  # lowercased email -> index key
+
+    def _candidate(self, name, email, skills):
+        text = f"{name} {skills or ''}"
+        if self.resumes:
+            text += "\n" + self.resumes.text(email)
+        return email, text, {"name": name, "skills": str(skills)}
+
+    async def run(self) -> dict:
+        if self._runs == 0:
+            self._column = await _updated_at_column(self.db)
+            if self._column is None:
+                logger.warning("candidates has no updatedAt/updated_at column; match index sync reads every row")
+        full = self._column is None or self._runs % self.reconcile_every == 0
+        self._runs += 1
+
+        sql = 'SELECT name, email, "technicalSkills"'
+        args = []
+        if self._column:
+            sql += f', "{self._column}" AS updated'
+        sql += " FROM candidates"
+        if not full and self._watermark is not None:
+            # >= so rows sharing the last timestamp aren't missed; unchanged text is a no-op
+            sql += f' WHERE "{self._column}" >= $1'
+            args.append(self._watermark)
+        rows = await self.db.query(sql, *args)
+
+        def apply():
+            resume_changes = self.resumes.refresh() if self.resumes else set()
+            candidates = [self._candidate(r["name"], r["email"], r["technicalSkills"]) for r in rows]
+            if full:
+                self._keys = {}
+            self._keys.update((email.lower(), email) for email, _, _ in candidates)
+            if full:
+                return self.index.sync(candidates)
+            # Candidates whose resume changed but whose row didn't
+            seen = {email.lower() for email, _, _ in candidates}
+            for email in resume_changes - seen:
+                row = self.index.row(self._keys.get(email, email))
+                if row:
+                    candidates.append(self._candidate(row["name"], row["key"], row["skills"]))
+            return self.index.update(candidates)
+
+        result = await asyncio.to_thread(apply)
+        updated = [r["updated"] for r in rows if r["updated"] is not None] if self._column else []
+        if updated:
+            self._watermark = max(updated + ([self._watermark] if self._watermark is not None else []))
+        return result
+
+
+async def refresh_forever(sync: CandidateSync, interval: float):
+    """Run ``sync`` every ``interval`` seconds."""
+    while True:
+        try:
+            result = await sync.run()
+            if result["updated"] or result["removed"]:
+                logger.info("Match index synced: %s", result)
+        except Exception:
+            logger.exception("Match index sync failed")
+        await asyncio.sleep(interval)
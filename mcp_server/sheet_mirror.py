@@ -0,0 +1,239 @@
+"""In-memory columnar mirror of one sheet, queried locally.
+
+The first row is the header. Values are fetched unformatted, so numbers stay
+numbers; a column is typed "number" when every non-empty cell is numeric and
+"string" otherwise. Key columns (e.g. email) get a hash index. The mirror
+re-downloads the sheet only when the spreadsheet's Drive ``version`` has
+changed, and checks that version at most every ``check_interval`` seconds.
+
+Writes made through this server go through ``append_row``/``write``. They are
+serialized, and an appended row is added to the local copy without a
+re-download when the mirror was current just before the append and the row
+landed right after the last known row. Any other write, including changes
+made outside this server, triggers a full re-download on the next query.
+"""
+
+import asyncio
+import logging
+import re
+import time
+
+from mcp_server import google_services
+
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "contains": lambda a, b: a is not None and b in a,
+    "in": lambda a, b: a in b,
+}
+
+# A1 start of an append's updatedRange, e.g. Sheet1!A7:E7 or 'My Sheet'!A7:E7
+_UPDATED_RANGE_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))!([A-Z]+)(\d+)")
+
+
+def _normalize(value, kind: str):
+    """Coerce a cell or query value to the column type; strings compare case-insensitively."""
+    if value is None or value == "":
+        return None
+    if kind == "number":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value).strip().lower()
+
+
+def _query_value(column: str, kind: str, op: str, value):
+    """Validate and normalize the value of one ``where`` condition."""
+    if op == "in":
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"'in' on '{column}' needs a list of values, e.g. {{\"in\": [\"a\", \"b\"]}}")
+        return [_query_value(column, kind, "eq", v) for v in value]
+    if op == "contains" and kind != "string":
+        raise ValueError(f"'contains' needs a text column; '{column}' is a {kind} column")
+    if isinstance(value, (dict, list, tuple)):
+        raise ValueError(f"'{op}' on '{column}' needs a single value, not {type(value).__name__}")
+
+    normalized = _normalize(value, kind)
+    if normalized is None:
+        if value is not None and value != "":
+            raise ValueError(f"'{column}' is a number column; {value!r} is not a number")
+        if op not in ("eq", "ne"):
+            raise ValueError(f"'{op}' on '{column}' needs a value")
+    return normalized
+
+
+class SheetMirror:
+    def __init__(self, spreadsheet_id: str, range_: str = "Sheet1", index_columns=("email",), check_interval: float = 15):
+        self.spreadsheet_id = spreadsheet_id
+        self.range = range_
+        self.index_columns = [c.lower() for c in index_columns]
+        self.check_interval = check_interval
+        self.headers: list[str] = []
+        self.columns: dict[str, list] = {}
+        self.types: dict[str, str] = {}
+        self.indexes: dict[str, dict] = {}
+        self.row_count = 0
+        self._values: list[list] = []
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    def invalidate(self):
+        """Force a version check on the next query (e.g. after a write through this server)."""
+        self._checked_at = 0.0
+
+    async def _remote_version(self):
+        try:
+            # Metadata-only scope: the Sheets server never needs to read Drive file content
+            file = await google_services.execute(
+                "drive",
+                "v3",
+                lambda drive: drive.files().get(fileId=self.spreadsheet_id, fields="version"),
+                scopes=google_services.DRIVE_METADATA_READONLY,
+            )
+            return file["version"]
+        except Exception:
+            logger.warning("Could not read sheet version; refetching values", exc_info=True)
+            return None
+
+    async def append_row(self, values: list, send):
+        """Append ``values`` via ``await send()`` (a Sheets append) and add the row locally.
+
+        Falls back to a full re-download on the next query when the mirror
+        can't be sure its copy plus this row matches the sheet.
+        """
+        async with self._write_lock:
+            before = await self._remote_version()
+            result = await send()
+            async with self._lock:
+                updated_range = result.get("updates", {}).get("updatedRange", "")
+                if before is not None and before == self._version and self._appended_after_last_row(updated_range):
+                    self._load(self._values + [list(values)])
+                    self._version = await self._remote_version()
+                    self._checked_at = time.monotonic()
+                else:
+                    self.invalidate()
+            return result
+
+    async def write(self, send):
+        """Run any other write via ``await send()``; the next query re-downloads the sheet."""
+        async with self._write_lock:
+            try:
+                return await send()
+            finally:
+                self.invalidate()
+
+    def _appended_after_last_row(self, updated_range: str) -> bool:
+        if "!" in self.range:
+            return False  # only whole-sheet mirrors know where the next row goes
+        match = _UPDATED_RANGE_RE.match(updated_range)
+        if not match:
+            return False
+        sheet = (match.group(1) or "").replace("''", "'") or match.group(2)
+        # Row 1 is the header, so the next data row is row_count + 2
+        return sheet == self.range and match.group(3) == "A" and int(match.group(4)) == self.row_count + 2
+
+    async def refresh(self):
+        """Re-download the sheet if it changed since the last sync."""
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            version = await self._remote_version()
+            if version is None or version != self._version:
+                result = await google_services.execute(
+                    "sheets",
+                    "v4",
+                    lambda sheets: sheets.spreadsheets().values().get(
+                        spreadsheetId=self.spreadsheet_id,
+                        range=self.range,
+                        valueRenderOption="UNFORMATTED_VALUE",
+                    ),
+                )
+                self._load(result.get("values", []))
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    def _load(self, values: list[list]):
+        headers = [str(h).strip() for h in values[0]] if values else []
+        rows = values[1:]
+        columns, types = {}, {}
+        for i, header in enumerate(headers):
+            name = header.lower()
+            cells = [row[i] if i < len(row) and row[i] != "" else None for row in rows]
+            numeric = all(isinstance(c, (int, float)) and not isinstance(c, bool) for c in cells if c is not None)
+            types[name] = "number" if numeric and any(c is not None for c in cells) else "string"
+            if types[name] == "string":
+                cells = [None if c is None else str(c) for c in cells]
+            columns[name] = cells
+
+        indexes = {}
+        for name in self.index_columns:
+            if name in columns:
+                index = {}
+                for row, value in enumerate(columns[name]):
+                    index.setdefault(_normalize(value, types[name]), []).append(row)
+                indexes[name] = index
+
+        self.headers, self.columns, self.types, self.indexes = headers, columns, types, indexes
+        self.row_count = len(rows)
+        self._values = values
+
+    def _column(self, name: str) -> str:
+        key = name.strip().lower()
+        if key not in self.columns:
+            raise ValueError(f"Unknown column '{name}'. Available: {', '.join(self.headers)}")
+        return key
+
+    def query(self, columns: list[str] = None, where: dict = None, order_by: str = None, limit: int = 50) -> list[dict]:
+        """Filter, sort and project rows.
+
+        ``where`` maps a column to a value (equality) or to ``{op: value}`` with
+        op in eq, ne, lt, lte, gt, gte, contains, in. Conditions are ANDed.
+        ``in`` takes a list, ``contains`` only applies to text columns, and
+        number columns only accept numbers; anything else raises ``ValueError``.
+        ``order_by`` is a column name, prefixed with "-" for descending.
+        """
+        if where is not None and not isinstance(where, dict):
+            raise ValueError('where must map column names to conditions, e.g. {"Email": "a@b.com"}')
+        conditions = []
+        for name, spec in (where or {}).items():
+            key = self._column(name)
+            for op, value in (spec.items() if isinstance(spec, dict) else [("eq", spec)]):
+                if op not in OPERATORS:
+                    raise ValueError(f"Unknown operator '{op}'. Use one of: {', '.join(OPERATORS)}")
+                conditions.append((key, op, _query_value(name, self.types[key], op, value)))
+
+        # Start from a hash index lookup when an indexed column is tested for equality
+        candidates = None
+        for key, op, value in conditions:
+            if key in self.indexes and op in ("eq", "in"):
+                values = value if op == "in" else [value]
+                candidates = sorted({row for v in values for row in self.indexes[key].get(v, [])})
+                break
+        rows = range(self.row_count) if candidates is None else candidates
+
+        matches = [
+            row for row in rows
+            if all(OPERATORS[op](_normalize(self.columns[key][row], self.types[key]), value) for key, op, value in conditions)
+        ]
+
+        if order_by:
+            descending = order_by.startswith("-")
+            key = self._column(order_by.lstrip("-"))
+            kind = self.types[key]
+            present = [row for row in matches if self.columns[key][row] is not None]
+            missing = [row for row in matches if self.columns[key][row] is None]
+            present.sort(key=lambda row: _normalize(self.columns[key][row], kind), reverse=descending)
+            matches = present + missing
+
+        selected = [self._column(c) for c in columns] if columns else [h.lower() for h in self.headers]
+        names = {h.lower(): h for h in self.headers}
+        return [{names[key]: self.columns[key][row] for key in selected} for row in matches[:limit]]
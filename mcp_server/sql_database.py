@@ -1,33 +1,197 @@
 import aiosqlite
 import asyncio
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from mcp_server.database import check_read_statement
+
+# asyncpg-style "$1" placeholders, skipping anything inside quoted literals/identifiers
+_PARAM_RE = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\$(\d+)")
+
+
+def _translate(sql: str) -> str:
+    """Rewrite ``$1`` placeholders to SQLite's numbered ``?1`` form."""
+    if "$" not in sql:
+        return sql
+    return _PARAM_RE.sub(lambda m: m.group(1) or f"?{m.group(2)}", sql)
+
+
+def _parse_path(database_url: str) -> str:
+    """Map ``sqlite:///app.db`` / ``sqlite:////abs/app.db`` (or a bare path) to a file path."""
+    if not database_url.startswith("sqlite:"):
+        return database_url
+    path = database_url[len("sqlite:"):]
+    if path.startswith("///"):
+        path = path[3:]
+    elif path.startswith("//"):
+        path = path[2:]
+    return path.split("?", 1)[0] or ":memory:"
+
+
+class Connection:
+    """Single SQLite connection exposing the same query helpers as Database."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def query(self, sql: str, *args):
+        async with self.conn.execute(_translate(sql), args) as cursor:
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def execute(self, sql: str, *args):
+        async with self.conn.execute(_translate(sql), args) as cursor:
+            return cursor.lastrowid
+
+    async def executemany(self, sql: str, args):
+        await self.conn.executemany(_translate(sql), args)
+
 
 class Database:
-    """Async SQLite database wrapper."""
+    """Async SQLite database wrapper.
 
-    def __init__(self, db_path: str = "app.db"):
+    Drop-in for the asyncpg ``Database``: one writer connection (serialized by a
+    lock, autocommit outside explicit transactions) plus a small pool of
+    read-only connections so SELECTs run in parallel under WAL.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(
+        self,
+        db_path: str = "app.db",
+        read_pool_size: int = 4,
+        cache_size_kib: int = 64 * 1024,
+        mmap_size: int = 256 * 1024 * 1024,
+    ):
         self.db_path = db_path
+        self.read_pool_size = 0 if db_path == ":memory:" else read_pool_size
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
         self.conn = None
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._readers = asyncio.Queue()
+        self._reader_conns = []
 
     @classmethod
-    async def connect(cls, db_path: str = "app.db"):
-        self = cls(db_path)
-        self.conn = await aiosqlite.connect(db_path)
+    async def connect(cls, db_path: str = "app.db", **kwargs):
+        """Open the writer and read pool. Accepts a bare path or a ``sqlite://`` URL."""
+        kwargs.setdefault("read_pool_size", int(os.getenv("SQLITE_READ_POOL_SIZE", "4")))
+        self = cls(_parse_path(db_path), **kwargs)
+
+        # isolation_level=None: no implicit BEGIN, so reads never open a write transaction
+        self.conn = await aiosqlite.connect(self.db_path, isolation_level=None)
         self.conn.row_factory = aiosqlite.Row
+        await self._apply_pragmas(self.conn)
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA foreign_keys=ON")
+        self._writer = Connection(self.conn)
+
+        reader_uri = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+        for _ in range(self.read_pool_size):
+            conn = await aiosqlite.connect(reader_uri, uri=True, isolation_level=None)
+            conn.row_factory = aiosqlite.Row
+            await self._apply_pragmas(conn)
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(Connection(conn))
         return self
 
+    async def _apply_pragmas(self, conn):
+        await conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        await conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        await conn.execute("PRAGMA temp_store=MEMORY")
+        await conn.execute("PRAGMA busy_timeout=5000")
+
     async def disconnect(self):
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns.clear()
         if self.conn:
-            await self.conn.close()
+            async with self._write_lock:
+                await self.conn.execute("PRAGMA optimize")
+                await self.conn.close()
+            self.conn = None
 
-    async def execute(self, sql: str, params: tuple = ()):
-        async with self.conn.execute(sql, params) as cursor:
-            await self.conn.commit()
-            return cursor.lastrowid
+    @asynccontextmanager
+    async def _reader(self):
+        """A pooled read-only connection (the locked writer for ``:memory:``)."""
+        if not self._reader_conns:
+            async with self._write_lock:
+                yield self._writer
+            return
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
+
+    async def query(self, sql: str, *args):
+        """Run a read-only statement on a pooled reader."""
+        async with self._reader() as reader:
+            return await reader.query(sql, *args)
+
+    async def guarded_query(self, sql: str, max_rows: int, timeout_ms: int, max_cost: float) -> dict:
+        """Run an untrusted read query safely.
+
+        Uses a read-only connection and aborts the statement after ``timeout_ms``.
+        Only the first ``max_rows`` rows are fetched. SQLite has no planner cost
+        estimate, so ``max_cost`` is not enforced here.
+        """
+        sql = check_read_statement(sql)
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout_ms / 1000
+        async with self._reader() as reader:
+            conn = reader.conn
+            if conn is self.conn:
+                await conn.execute("PRAGMA query_only=ON")
+            await conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            try:
+                async with conn.execute(sql) as cursor:
+                    columns = [d[0] for d in cursor.description or []]
+                    rows = await cursor.fetchmany(max_rows + 1)
+            finally:
+                await conn.set_progress_handler(None, 0)
+                if conn is self.conn:
+                    await conn.execute("PRAGMA query_only=OFF")
+
+        return {
+            "columns": columns,
+            "rows": [list(row) for row in rows[:max_rows]],
+            "truncated": len(rows) > max_rows,
+            "estimated_cost": None,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def execute(self, sql: str, *args):
+        """Run a single write statement and return ``lastrowid``."""
+        async with self._write_lock:
+            return await self._writer.execute(sql, *args)
+
+    async def executemany(self, sql: str, args):
+        """Run one statement for every parameter tuple in ``args`` in a single transaction."""
+        async with self.transaction() as conn:
+            await conn.executemany(sql, args)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Hold the writer for an explicit ``BEGIN IMMEDIATE`` ... ``COMMIT`` block.
+
+        Statements must go through the yielded ``Connection``, not ``self``.
+        """
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                await self.conn.execute("ROLLBACK")
+                raise
+            await self.conn.execute("COMMIT")
 
-    async def query(self, sql: str, params: tuple = ()):
-        async with self.conn.execute(sql, params) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
 
 async def main():
     db = await Database.connect()
@@ -47,8 +211,8 @@ async def main():
 
     try:
         user_id = await db.execute(
-            "INSERT INTO users (name, email) VALUES (?, ?)",
-            (name, email)
+            "INSERT INTO users (name, email) VALUES ($1, $2)",
+            name, email
         )
         print(f"✅ User added with ID {user_id}")
     except Exception as e:
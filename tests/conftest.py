@@ -0,0 +1,4 @@
+import os
+
+# llm.llm_client reads the key at import time; tests never reach the API
+os.environ.setdefault("OPENAI_API_KEY", "test")
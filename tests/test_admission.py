@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from mcp_server.admission import AdmissionController, Limiter, Overloaded
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_limiter_admits_up_to_the_limit_then_sheds():
+    async def main():
+        limiter = Limiter("t", max_concurrent=2, max_queue=0)
+        await limiter.acquire(1)
+        await limiter.acquire(1)
+        with pytest.raises(Overloaded, match="t is overloaded, retry after"):
+            await limiter.acquire(1)
+        assert limiter.active == 2
+
+    asyncio.run(main())
+
+
+def test_release_hands_slots_to_waiters_in_fifo_order():
+    async def main():
+        limiter = Limiter("t", max_concurrent=1, max_queue=5)
+        await limiter.acquire(1)
+        order = []
+
+        async def waiter(name):
+            await limiter.acquire(1)
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(waiter(n)) for n in "abc"]
+        await settle()
+        assert len(limiter._waiters) == 3
+
+        for _ in "abc":
+            limiter.release()
+            await settle()
+            assert limiter.active == 1
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c"]
+
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+
+def test_full_queue_sheds_immediately():
+    async def main():
+        limiter = Limiter("t", max_concurrent=1, max_queue=1)
+        await limiter.acquire(1)
+        queued = asyncio.ensure_future(limiter.acquire(1))
+        await settle()
+        with pytest.raises(Overloaded):
+            await limiter.acquire(1)
+        limiter.release()
+        await queued
+
+    asyncio.run(main())
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    async def main():
+        limiter = Limiter("t", max_concurrent=1, max_queue=5)
+        await limiter.acquire(1)
+        with pytest.raises(Overloaded):
+            await limiter.acquire(0.01)
+        assert not limiter._waiters
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        limiter = Limiter("t", max_concurrent=1, max_queue=5)
+        await limiter.acquire(1)
+        task = asyncio.ensure_future(limiter.acquire(1))
+        await settle()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not limiter._waiters
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+
+def test_slot_handed_to_a_waiter_that_gives_up_is_passed_on():
+    async def main():
+        limiter = Limiter("t", max_concurrent=1, max_queue=5)
+        await limiter.acquire(1)
+        first = asyncio.ensure_future(limiter.acquire(1))
+        second = asyncio.ensure_future(limiter.acquire(1))
+        await settle()
+
+        # Hand the slot to `first`, then cancel it before it resumes. Depending
+        # on the Python version wait_for either raises or returns the result.
+        limiter.release()
+        first.cancel()
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass
+        else:
+            limiter.release()
+        await second
+        assert limiter.active == 1
+
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+
+def test_limit_applies_tool_and_server_limits_and_releases_on_error():
+    admission = AdmissionController("svc", max_concurrent=2, max_queue=0, queue_timeout=0.05)
+
+    async def main():
+        release = asyncio.Event()
+
+        @admission.limit(max_concurrent=1, max_queue=0)
+        async def slow():
+            await release.wait()
+            return "done"
+
+        @admission.limit()
+        async def failing():
+            raise RuntimeError("boom")
+
+        running = asyncio.ensure_future(slow())
+        await settle()
+        with pytest.raises(Overloaded, match="svc.slow is overloaded"):
+            await slow()
+        # A tool-level rejection must not leak a server slot
+        assert admission.server.active == 1
+
+        with pytest.raises(RuntimeError):
+            await failing()
+        assert admission.server.active == 1
+
+        release.set()
+        assert await running == "done"
+        assert admission.server.active == 0
+
+    asyncio.run(main())
+
+
+def test_from_env_overrides_defaults(monkeypatch):
+    monkeypatch.setenv("TEST_MAX_CONCURRENT", "3")
+    monkeypatch.setenv("TEST_QUEUE_TIMEOUT", "0.5")
+    admission = AdmissionController.from_env("TEST", max_concurrent=10, max_queue=7)
+    assert admission.name == "test"
+    assert admission.server.max_concurrent == 3
+    assert admission.server.max_queue == 7
+    assert admission.queue_timeout == 0.5
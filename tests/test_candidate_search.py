@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from mcp_server import candidate_search
+from mcp_server.sql_database import Database
+
+CANDIDATES = [
+    ("Alice", "alice@example.com", "Python, PostgreSQL, React"),
+    ("Bob", "bob@example.com", "Node.js, React"),
+    ("Carol", "carol@example.com", "Go, Kubernetes"),
+]
+
+
+def run(tmp_path, body):
+    async def main():
+        db = await Database.connect(f"sqlite:///{tmp_path / 'test.db'}")
+        try:
+            assert await candidate_search.prepare(db) is None
+            await db.executemany(
+                'INSERT INTO candidates (name, email, "technicalSkills") VALUES ($1, $2, $3)', CANDIDATES
+            )
+            return await body(db)
+        finally:
+            await db.disconnect()
+
+    return asyncio.run(main())
+
+
+def test_search_matches_skills_and_text_and_pages(tmp_path):
+    async def body(db):
+        by_skill, _ = await candidate_search.search(db, ["react"])
+        by_text, _ = await candidate_search.search(db, text="kube")
+        first, cursor = await candidate_search.search(db, ["react", "go"], limit=2)
+        rest, last = await candidate_search.search(db, ["react", "go"], limit=2, cursor=cursor)
+        return by_skill, by_text, first, rest, cursor, last
+
+    by_skill, by_text, first, rest, cursor, last = run(tmp_path, body)
+    assert sorted(r["name"] for r in by_skill) == ["Alice", "Bob"]
+    assert [r["name"] for r in by_text] == ["Carol"]
+    assert cursor == "2" and last is None
+    assert sorted(r["name"] for r in first + rest) == ["Alice", "Bob", "Carol"]
+
+
+@pytest.mark.parametrize("skills, text", [
+    (None, None),
+    ([], "   "),
+    ([" "], None),
+    (["", "\t"], ""),
+])
+def test_blank_search_raises_value_error(tmp_path, skills, text):
+    async def body(db):
+        with pytest.raises(ValueError, match="Provide skills and/or text"):
+            await candidate_search.search(db, skills, text)
+
+    run(tmp_path, body)
+
+
+def test_invalid_cursor_raises_value_error(tmp_path):
+    async def body(db):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await candidate_search.search(db, ["react"], cursor="abc")
+
+    run(tmp_path, body)
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import Context
+
+from mcp_server.coalesce import _inflight, coalesce
+
+
+def make_tool(delay=0.01, error=None):
+    calls = []
+
+    @coalesce
+    async def tool(ctx: Context, name: str, limit: int = 10):
+        calls.append((name, limit))
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return f"{name}:{limit}"
+
+    return tool, calls
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    tool, calls = make_tool()
+
+    async def main():
+        return await asyncio.gather(*(tool(Context(), "a") for _ in range(5)))
+
+    assert asyncio.run(main()) == ["a:10"] * 5
+    assert calls == [("a", 10)]
+    assert not _inflight
+
+
+def test_defaults_and_keywords_are_part_of_the_key():
+    tool, calls = make_tool()
+
+    async def main():
+        return await asyncio.gather(
+            tool(Context(), "a"),
+            tool(Context(), "a", limit=10),
+            tool(Context(), name="a", limit=3),
+            tool(Context(), "b"),
+        )
+
+    assert asyncio.run(main()) == ["a:10", "a:10", "a:3", "b:10"]
+    assert sorted(calls) == [("a", 3), ("a", 10), ("b", 10)]
+
+
+def test_sequential_calls_are_not_cached():
+    tool, calls = make_tool()
+
+    async def main():
+        await tool(Context(), "a")
+        await tool(Context(), "a")
+
+    asyncio.run(main())
+    assert calls == [("a", 10), ("a", 10)]
+
+
+def test_exception_reaches_every_caller_and_is_not_cached():
+    tool, calls = make_tool(error=RuntimeError("upstream down"))
+
+    async def main():
+        results = await asyncio.gather(*(tool(Context(), "a") for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await tool(Context(), "a")
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    tool, calls = make_tool(delay=0.05)
+
+    async def main():
+        first = asyncio.ensure_future(tool(Context(), "a"))
+        second = asyncio.ensure_future(tool(Context(), "a"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "a:10"
+        assert first.cancelled()
+
+    asyncio.run(main())
+    assert calls == [("a", 10)]
@@ -0,0 +1,113 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from mcp_server.database import QueryRejected, check_read_statement
+from mcp_server.sql_database import Database
+
+# Postgres-style data-modifying CTE (a syntax error in SQLite) and SQLite's own WITH ... DELETE
+WRITE_CTES = [
+    "WITH gone AS (DELETE FROM items RETURNING *) SELECT count(*) FROM gone",
+    "WITH doomed AS (SELECT id FROM items) DELETE FROM items WHERE id IN (SELECT id FROM doomed)",
+]
+RECURSIVE_CTE = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT max(x) FROM n"
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT 1;", "SELECT 1"),
+    ("  with a as (select 1) select * from a ; ", "with a as (select 1) select * from a"),
+    ("VALUES (1), (2)", "VALUES (1), (2)"),
+    ("SELECT ';' AS semi, \"a;b\" FROM t", "SELECT ';' AS semi, \"a;b\" FROM t"),
+    ("SELECT 'it''s; fine'", "SELECT 'it''s; fine'"),
+])
+def test_check_read_statement_accepts_single_reads(sql, expected):
+    assert check_read_statement(sql) == expected
+
+
+@pytest.mark.parametrize("sql, message", [
+    ("DELETE FROM items", "Only SELECT"),
+    ("UPDATE items SET name = 'x'", "Only SELECT"),
+    ("PRAGMA query_only=OFF", "Only SELECT"),
+    ("ATTACH DATABASE 'x.db' AS x", "Only SELECT"),
+    ("selector", "Only SELECT"),
+    ("", "Only SELECT"),
+    ("SELECT 1; DELETE FROM items", "single statement"),
+    ("SELECT 1;; SELECT 2", "single statement"),
+    ("SELECT 'a'; DROP TABLE items; --'", "single statement"),
+])
+def test_check_read_statement_rejects(sql, message):
+    with pytest.raises(QueryRejected, match=message):
+        check_read_statement(sql)
+
+
+@pytest.mark.parametrize("sql", WRITE_CTES)
+def test_write_ctes_pass_the_check(sql):
+    assert check_read_statement(sql) == sql
+
+
+def run(url, body):
+    async def main():
+        db = await Database.connect(url)
+        try:
+            await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            await db.executemany("INSERT INTO items (name) VALUES ($1)", [(f"n{i}",) for i in range(5)])
+            return await body(db)
+        finally:
+            await db.disconnect()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(params=["file", "memory"])
+def url(request, tmp_path):
+    # A file database reads from the read-only pool; :memory: borrows the writer
+    return f"sqlite:///{tmp_path / 'test.db'}" if request.param == "file" else "sqlite://"
+
+
+def test_max_rows_and_truncated(url):
+    async def body(db):
+        return (
+            await db.guarded_query("SELECT id, name FROM items ORDER BY id", 3, 1000, 0),
+            await db.guarded_query("SELECT id FROM items", 5, 1000, 0),
+            await db.guarded_query("SELECT id FROM items WHERE id > 99", 5, 1000, 0),
+        )
+
+    limited, exact, empty = run(url, body)
+    assert limited["columns"] == ["id", "name"]
+    assert limited["rows"] == [[1, "n0"], [2, "n1"], [3, "n2"]]
+    assert limited["truncated"] is True
+    assert limited["estimated_cost"] is None
+    assert len(exact["rows"]) == 5 and exact["truncated"] is False
+    assert empty["columns"] == ["id"] and empty["rows"] == [] and empty["truncated"] is False
+
+
+def test_write_cte_fails_on_the_read_only_connection(url):
+    async def body(db):
+        with pytest.raises(sqlite3.OperationalError):
+            await db.guarded_query(WRITE_CTES[0], 10, 1000, 0)
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            await db.guarded_query(WRITE_CTES[1], 10, 1000, 0)
+        with pytest.raises(QueryRejected):
+            await db.guarded_query("DELETE FROM items", 10, 1000, 0)
+        # Nothing was deleted, and the writer still accepts writes afterwards
+        await db.execute("INSERT INTO items (name) VALUES ($1)", "after")
+        return await db.query("SELECT count(*) AS n FROM items")
+
+    assert run(url, body) == [{"n": 6}]
+
+
+def test_runaway_query_is_interrupted_by_the_timeout(url):
+    async def body(db):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+            await db.guarded_query(RECURSIVE_CTE, 10, 50, 0)
+        elapsed = loop.time() - started
+        # The progress handler is removed, so later queries run normally
+        result = await db.guarded_query("SELECT count(*) FROM items", 10, 1000, 0)
+        return elapsed, result
+
+    elapsed, result = run(url, body)
+    assert elapsed < 5
+    assert result["rows"] == [[5]]
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from workflow import interview_flow
+from workflow.interview_flow import InterviewEngine, generate_role_questions
+from workflow.utils import InterviewStore, QuestionCache
+
+
+def fake_llm(monkeypatch, *replies):
+    replies = list(replies)
+    calls = []
+
+    async def ask_llm(prompt, system_message=None):
+        calls.append(prompt)
+        return replies.pop(0)
+
+    monkeypatch.setattr(interview_flow, "ask_llm", ask_llm)
+    return calls
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('```json\n["What is a GIL?", " ", "Explain asyncio."]\n```', ["What is a GIL?", "Explain asyncio."]),
+    ("1. What is a GIL?\n\n- Explain asyncio\n", ["What is a GIL?", "Explain asyncio"]),
+    ('["q1", "q2", "q3", "q4", "q5", "q6"]', ["q1", "q2", "q3", "q4", "q5"]),
+])
+def test_generate_role_questions_parses_replies(monkeypatch, reply, expected):
+    fake_llm(monkeypatch, reply)
+    assert asyncio.run(generate_role_questions("Backend")) == expected
+
+
+@pytest.mark.parametrize("reply", ["[]", "", "  \n", '["", " "]', "1.\n-\n"])
+def test_generate_role_questions_rejects_empty_replies(monkeypatch, reply):
+    fake_llm(monkeypatch, reply)
+    with pytest.raises(ValueError, match="no questions"):
+        asyncio.run(generate_role_questions("Backend"))
+
+
+def run_with_store(tmp_path, body):
+    async def main():
+        store = await InterviewStore.open(str(tmp_path / "interviews.db"))
+        try:
+            return await body(store)
+        finally:
+            await store.close()
+
+    return asyncio.run(main())
+
+
+def test_empty_question_set_is_never_cached_or_saved(tmp_path):
+    results = [[], ["q1"]]
+
+    async def generate(role):
+        return results.pop(0)
+
+    async def body(store):
+        cache = QuestionCache(store, generate)
+        with pytest.raises(ValueError, match="No questions"):
+            await cache.get("Backend")
+        assert cache._memory == {} and cache._inflight == {}
+        assert await store.load_questions("backend") is None
+
+        assert await cache.get("backend ") == ["q1"]
+        assert await store.load_questions("backend") == ["q1"]
+
+    run_with_store(tmp_path, body)
+
+
+def test_question_failure_stops_the_run_with_a_retryable_error(tmp_path, monkeypatch):
+    calls = fake_llm(monkeypatch, "[]", '["q1"]')
+    state = {
+        "interview_id": "i1", "candidate_email": "a@example.com", "role": "Backend",
+        "status": "running", "candidate": "Name: A, Email: a@example.com",
+    }
+
+    async def body(store):
+        engine = InterviewEngine({}, store)
+        failed = await engine.graph.ainvoke(state)
+        saved = await store.load("i1")
+        retried = await engine.graph.ainvoke({**failed, "status": "running", "error": None})
+        return failed, saved, retried
+
+    failed, saved, retried = run_with_store(tmp_path, body)
+    assert failed["status"] == "error" and "generate_questions" in failed["error"]
+    assert not failed.get("questions")
+    assert saved["status"] == "error"
+    assert len(calls) == 2
+    assert retried["questions"] == ["q1"] and retried["status"] == "awaiting_answers"
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from mcp_server import match_index
+from mcp_server.match_index import MatchIndex, ResumeTexts, vectorize
+
+
+@pytest.fixture
+def small_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(match_index, "INITIAL_CAPACITY", 2)
+    return MatchIndex(str(tmp_path / "index"), dim=256)
+
+
+def keys(results):
+    return [row["key"] for _, row in results]
+
+
+def test_vectorize_is_deterministic_and_case_insensitive():
+    a = vectorize("Python, React and Node.js", dim=256)
+    assert a.shape == (256,) and a.dtype == np.float32
+    assert np.array_equal(a, vectorize("python react AND node.js.", dim=256))
+    assert not np.array_equal(a, vectorize("python go", dim=256))
+    assert not vectorize("!!! ---", dim=256).any()
+
+
+def test_upsert_skips_unchanged_text_and_grows(small_index):
+    assert small_index.upsert("a", "python django", {"name": "A"})
+    assert not small_index.upsert("a", "python django", {"name": "A"})
+    for key in "bcde":
+        small_index.upsert(key, f"{key} golang", {"name": key.upper()})
+
+    assert len(small_index) == 5
+    assert small_index.vectors.shape[0] == 8
+    assert small_index.row("a")["name"] == "A"
+    assert keys(small_index.search("python", top_k=1)) == ["a"]
+
+
+def test_removed_slots_are_reused(small_index):
+    for key in "abc":
+        small_index.upsert(key, f"skill{key} common", {})
+    slot = small_index._slots["b"]
+    small_index.remove("b")
+    small_index.remove("missing")
+
+    assert small_index.row("b") is None
+    assert not small_index.vectors[slot].any()
+    assert small_index.search("skillb") == []
+
+    small_index.upsert("d", "skilld common", {})
+    assert small_index._slots["d"] == slot
+    assert len(small_index.rows) == 3
+    assert keys(small_index.search("skilld")) == ["d"]
+
+
+def test_search_ranks_by_similarity(small_index):
+    small_index.upsert("both", "python react", {})
+    small_index.upsert("python", "python java golang", {})
+    small_index.upsert("other", "rust haskell", {})
+
+    assert keys(small_index.search("python react")) == ["both", "python"]
+    assert keys(small_index.search("python react", top_k=1)) == ["both"]
+    scores = [score for score, _ in small_index.search("python react")]
+    assert scores == sorted(scores, reverse=True) and 0 < scores[-1] < scores[0] <= 1.0001
+    assert small_index.search("python", top_k=0) == []
+    assert small_index.search("cobol") == []
+
+
+def test_search_across_blocks(small_index, monkeypatch):
+    monkeypatch.setattr(match_index, "BLOCK_ROWS", 2)
+    for i in range(7):
+        small_index.upsert(f"k{i}", "python " * (i + 1) + f"filler{i}", {})
+    assert keys(small_index.search("python", top_k=3)) == ["k6", "k5", "k4"]
+
+
+def test_sync_persists_and_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(match_index, "INITIAL_CAPACITY", 2)
+    root = str(tmp_path / "index")
+    index = MatchIndex(root, dim=256)
+    assert index.sync([(k, f"{k} python", {"name": k}) for k in "abc"]) == {"updated": 3, "removed": 0, "total": 3}
+    assert index.sync([("a", "a python", {"name": "a"}), ("c", "c golang", {"name": "c"})]) == {
+        "updated": 1, "removed": 1, "total": 2,
+    }
+    expected = index.search("python golang")
+
+    reloaded = MatchIndex(root, dim=256)
+    assert len(reloaded) == 2
+    assert reloaded.row("c")["name"] == "c"
+    assert reloaded._free == [1]  # b's slot
+    assert np.array_equal(reloaded._df, index._df)
+    assert reloaded.search("python golang") == expected
+
+    # A different dimension starts from an empty index
+    assert len(MatchIndex(root, dim=128)) == 0
+
+
+def write(root, name, text):
+    (root / name).write_text(text, encoding="utf-8")
+
+
+def test_resume_texts_are_cached_until_a_file_changes(tmp_path):
+    write(tmp_path, "r1-v1.txt", "Alice, ALICE@example.com. Python")
+    write(tmp_path, "r2-v1.txt", "bob@example.com and alice@example.com")
+    resumes = ResumeTexts(str(tmp_path))
+
+    assert resumes.refresh() == {"alice@example.com", "bob@example.com"}
+    assert resumes.text("Alice@Example.com") == "Alice, ALICE@example.com. Python\nbob@example.com and alice@example.com"
+
+    # Same name means same Drive version, so the cached text is served without a read
+    write(tmp_path, "r2-v1.txt", "overwritten")
+    assert resumes.refresh() == set()
+    assert resumes.text("alice@example.com").endswith("bob@example.com and alice@example.com")
+
+    (tmp_path / "r1-v1.txt").unlink()
+    write(tmp_path, "r1-v2.txt", "Alice alice@example.com. Python, Go")
+    assert resumes.refresh() == {"alice@example.com"}
+    assert resumes.text("alice@example.com") == "Alice alice@example.com. Python, Go\noverwritten"
+    assert resumes.text("carol@example.com") == ""
+
+
+def test_resume_texts_without_a_store(tmp_path):
+    resumes = ResumeTexts(str(tmp_path / "missing"))
+    assert resumes.refresh() == set()
+    assert resumes.text("alice@example.com") == ""
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from mcp_server.sheet_mirror import SheetMirror
+
+VALUES = [
+    ["Name", "Email", "Role", "Score"],
+    ["Alice", "alice@example.com", "Backend", 8],
+    ["Bob", "BOB@example.com", "Frontend", 6.5],
+    ["Carol", "carol@example.com", "Backend"],
+    ["Dan", "dan@example.com", "Data", 9],
+]
+
+
+def make_mirror(values=VALUES, range_="Sheet1"):
+    mirror = SheetMirror("sheet-id", range_)
+    mirror._load([list(row) for row in values])
+    mirror._version = "1"
+    return mirror
+
+
+def names(rows):
+    return [row["Name"] for row in rows]
+
+
+def test_columns_are_typed():
+    mirror = make_mirror()
+    assert mirror.types == {"name": "string", "email": "string", "role": "string", "score": "number"}
+    assert mirror.row_count == 4
+
+
+def test_equality_uses_the_index_and_ignores_case():
+    mirror = make_mirror()
+    assert names(mirror.query(where={"Email": "bob@EXAMPLE.com"})) == ["Bob"]
+    assert names(mirror.query(where={"email": {"in": ["alice@example.com", "dan@example.com"]}})) == ["Alice", "Dan"]
+
+
+def test_operators_filters_and_projection():
+    mirror = make_mirror()
+    assert names(mirror.query(where={"Score": {"gte": 8}})) == ["Alice", "Dan"]
+    assert names(mirror.query(where={"Score": {"lt": "7"}})) == ["Bob"]
+    assert names(mirror.query(where={"Role": {"contains": "end"}, "Score": {"gt": 7}})) == ["Alice"]
+    assert names(mirror.query(where={"Score": None})) == ["Carol"]
+    assert mirror.query(["Name"], {"Role": {"ne": "backend"}}) == [{"Name": "Bob"}, {"Name": "Dan"}]
+
+
+def test_order_by_puts_empty_cells_last():
+    mirror = make_mirror()
+    assert names(mirror.query(order_by="-Score")) == ["Dan", "Alice", "Bob", "Carol"]
+    assert names(mirror.query(order_by="Score", limit=2)) == ["Bob", "Alice"]
+
+
+@pytest.mark.parametrize("where, message", [
+    ({"Score": {"gt": "high"}}, "not a number"),
+    ({"Score": {"contains": "7"}}, "text column"),
+    ({"Score": {"in": 7}}, "list of values"),
+    ({"Name": {"in": "AB"}}, "list of values"),
+    ({"Score": {"in": [7, "x"]}}, "not a number"),
+    ({"Score": {"gt": None}}, "needs a value"),
+    ({"Name": {"eq": ["a"]}}, "single value"),
+    ({"Name": {"like": "a"}}, "Unknown operator"),
+    ({"Salary": 1}, "Unknown column"),
+    ("Name = Alice", "where must map"),
+])
+def test_invalid_filters_raise_value_error(where, message):
+    with pytest.raises(ValueError, match=message):
+        make_mirror().query(where=where)
+
+
+def fake_append(mirror, updated_range, versions):
+    async def remote_version():
+        return versions.pop(0)
+
+    mirror._remote_version = remote_version
+
+    async def send():
+        return {"updates": {"updatedRange": updated_range}}
+
+    return send
+
+
+def test_append_row_updates_the_mirror_locally():
+    mirror = make_mirror()
+    send = fake_append(mirror, "Sheet1!A6:D6", ["1", "2"])
+
+    asyncio.run(mirror.append_row(["Eve", "eve@example.com", "Data", "7"], send))
+
+    assert mirror.row_count == 5
+    assert mirror._version == "2"
+    assert mirror._checked_at > 0
+    assert names(mirror.query(where={"Email": "eve@example.com"})) == ["Eve"]
+    # RAW string input turns Score into a text column, exactly as a re-download would
+    assert mirror.types["score"] == "string"
+
+
+@pytest.mark.parametrize("updated_range, versions", [
+    ("Sheet1!A9:D9", ["1", "2"]),  # someone else appended rows too
+    ("Sheet2!A6:D6", ["1", "2"]),
+    ("Sheet1!B6:E6", ["1", "2"]),
+    ("Sheet1!A6:D6", ["0", "2"]),  # mirror was already stale before the append
+    ("Sheet1!A6:D6", [None, "2"]),
+])
+def test_append_row_falls_back_to_a_full_refresh(updated_range, versions):
+    mirror = make_mirror()
+    mirror._checked_at = 123.0
+    send = fake_append(mirror, updated_range, versions)
+
+    asyncio.run(mirror.append_row(["Eve", "eve@example.com", "Data", "7"], send))
+
+    assert mirror.row_count == 4
+    assert mirror._checked_at == 0.0
+
+
+def test_append_row_on_a_partial_range_mirror_refreshes():
+    mirror = make_mirror(range_="Sheet1!A:D")
+    send = fake_append(mirror, "Sheet1!A6:D6", ["1", "2"])
+    asyncio.run(mirror.append_row(["Eve"], send))
+    assert mirror._checked_at == 0.0
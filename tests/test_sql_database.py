@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from mcp_server.sql_database import Database, _parse_path, _translate
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t WHERE a = $1 AND b = $2", "SELECT * FROM t WHERE a = ?1 AND b = ?2"),
+    ("SELECT $10, $1", "SELECT ?10, ?1"),
+    ("SELECT '$1' , $1", "SELECT '$1' , ?1"),
+    ("SELECT 'it''s $1', $2", "SELECT 'it''s $1', ?2"),
+    ('SELECT "$1" FROM t WHERE x = $1', 'SELECT "$1" FROM t WHERE x = ?1'),
+    ('SELECT "a""$2" FROM t', 'SELECT "a""$2" FROM t'),
+    ("SELECT 1", "SELECT 1"),
+])
+def test_translate_rewrites_placeholders_outside_quotes(sql, expected):
+    assert _translate(sql) == expected
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///app.db", "app.db"),
+    ("sqlite:///data/app.db?mode=rwc", "data/app.db"),
+    ("sqlite:////abs/app.db", "/abs/app.db"),
+    ("sqlite://", ":memory:"),
+    ("sqlite:///:memory:", ":memory:"),
+    ("local.db", "local.db"),
+])
+def test_parse_path(url, expected):
+    assert _parse_path(url) == expected
+
+
+def run(tmp_path, body, **kwargs):
+    async def main():
+        db = await Database.connect(f"sqlite:///{tmp_path / 'test.db'}", **kwargs)
+        try:
+            await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+            return await body(db)
+        finally:
+            await db.disconnect()
+
+    return asyncio.run(main())
+
+
+def test_write_is_visible_from_pooled_readers(tmp_path):
+    async def body(db):
+        assert len(db._reader_conns) == 2
+        row_id = await db.execute("INSERT INTO items (name) VALUES ($1)", "a")
+        results = await asyncio.gather(*(db.query("SELECT id, name FROM items") for _ in range(4)))
+        return row_id, results
+
+    row_id, results = run(tmp_path, body, read_pool_size=2)
+    assert row_id == 1
+    assert all(rows == [{"id": 1, "name": "a"}] for rows in results)
+
+
+def test_readers_cannot_write(tmp_path):
+    async def body(db):
+        with pytest.raises(Exception, match="readonly"):
+            await db.query("INSERT INTO items (name) VALUES ('x')")
+
+    run(tmp_path, body)
+
+
+def test_transaction_commits_or_rolls_back(tmp_path):
+    async def body(db):
+        async with db.transaction() as conn:
+            await conn.execute("INSERT INTO items (name) VALUES ($1)", "kept")
+
+        with pytest.raises(RuntimeError):
+            async with db.transaction() as conn:
+                await conn.execute("INSERT INTO items (name) VALUES ($1)", "dropped")
+                raise RuntimeError("abort")
+
+        # The writer is usable again after the rollback
+        await db.execute("INSERT INTO items (name) VALUES ($1)", "after")
+        return await db.query("SELECT name FROM items ORDER BY id")
+
+    assert [r["name"] for r in run(tmp_path, body)] == ["kept", "after"]
+
+
+def test_executemany_is_all_or_nothing(tmp_path):
+    async def body(db):
+        await db.executemany("INSERT INTO items (name) VALUES ($1)", [(f"n{i}",) for i in range(100)])
+        with pytest.raises(Exception, match="UNIQUE"):
+            await db.executemany("INSERT INTO items (name) VALUES ($1)", [("new",), ("n5",)])
+        return await db.query("SELECT count(*) AS n, sum(name = 'new') AS new FROM items")
+
+    assert run(tmp_path, body) == [{"n": 100, "new": 0}]
+
+
+def test_memory_database_uses_the_writer_for_reads():
+    async def main():
+        db = await Database.connect("sqlite://")
+        try:
+            assert db.read_pool_size == 0
+            await db.execute("CREATE TABLE t (x)")
+            await db.execute("INSERT INTO t VALUES ($1)", 1)
+            return await db.query("SELECT x FROM t")
+        finally:
+            await db.disconnect()
+
+    assert asyncio.run(main()) == [{"x": 1}]
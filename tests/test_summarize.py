@@ -0,0 +1,54 @@
+import pytest
+
+from llm import summarize
+from llm.summarize import split_into_chunks, trim_to_budget
+
+
+@pytest.fixture(autouse=True)
+def one_token_per_character(monkeypatch):
+    monkeypatch.setattr(summarize, "count_tokens", len)
+
+
+def test_split_keeps_whole_lines_within_the_chunk_size():
+    lines = [f"line{i:02d}" for i in range(20)]  # 6 tokens + 1 for the newline
+    chunks = split_into_chunks("\n".join(lines), chunk_tokens=21)
+
+    assert chunks[0] == "line00\nline01\nline02"
+    assert all(len(chunk) <= 21 for chunk in chunks)
+    assert "\n".join(chunks).splitlines() == lines
+
+
+def test_split_cuts_a_single_oversized_line():
+    line = "x" * 95
+    chunks = split_into_chunks(f"short\n{line}\ntail", chunk_tokens=20)
+
+    assert chunks[0] == "short"
+    assert chunks[-1] == "tail"
+    assert "".join(chunks[1:-1]) == line
+    assert all(len(chunk) <= 20 for chunk in chunks)
+
+
+@pytest.mark.parametrize("chunk_tokens", [5, 13, 64])
+def test_chunks_never_exceed_chunk_tokens(chunk_tokens):
+    text = "\n".join("word " * n for n in (1, 30, 2, 7, 0, 12, 3))
+    chunks = split_into_chunks(text, chunk_tokens=chunk_tokens)
+    assert chunks
+    assert all(len(chunk) <= chunk_tokens for chunk in chunks)
+
+
+def test_trim_keeps_head_and_tail_and_marks_the_gap():
+    lines = [f"line{i:02d}" for i in range(10)]  # 7 tokens each with the newline
+    trimmed = trim_to_budget("\n".join(lines), budget=30)
+
+    # 2/3 of the budget (20) fits two head lines, 1/3 (10) one tail line
+    assert trimmed.splitlines() == ["line00", "line01", "[... 7 lines omitted ...]", "line09"]
+
+
+def test_trim_returns_text_that_fits_unchanged():
+    text = "a\nb\nc"
+    assert trim_to_budget(text, budget=30) is text
+
+
+def test_trim_cuts_a_single_line_over_the_budget_by_characters():
+    trimmed = trim_to_budget("y" * 1000, budget=30)
+    assert trimmed == "y" * 120 + "\n[... output truncated ...]"
@@ -0,0 +1,323 @@
+"""Interview workflow engine.
+
+fetch candidate -> generate questions -> evaluate answers -> record to Sheets -> email result
+
+Each interview is one LangGraph run. Many runs share one event loop, one MCP
+session per server and one question cache. Per-stage semaphores cap how many
+interviews sit in each stage at once. State is saved after every stage, so an
+interview resumes from the first stage whose output is missing. It stops at
+``awaiting_answers`` until ``submit_answers`` is called.
+
+The two stages with outside side effects are safe to resume. A marker is
+saved before each call. A resumed ``record_result`` first checks the sheet for
+the interview id (its last column), and a resumed ``email_result`` never
+resends an email that may already have gone out.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TypedDict
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from langgraph.graph import END, START, StateGraph
+
+from llm.llm_client import ask_llm
+from workflow.utils import InterviewStore, QuestionCache, parse_json
+
+logger = logging.getLogger(__name__)
+
+MCP_SERVERS = {
+    "db": {"transport": "streamable_http", "url": os.getenv("DB_MCP_URL", "http://127.0.0.1:8001/mcp/")},
+    "sheets": {"transport": "streamable_http", "url": os.getenv("SHEETS_MCP_URL", "http://127.0.0.1:8003/mcp/")},
+    "email": {"transport": "streamable_http", "url": os.getenv("EMAIL_MCP_URL", "http://127.0.0.1:8004/mcp/")},
+}
+
+STAGES = ["fetch_candidate", "generate_questions", "evaluate_answers", "record_result", "email_result"]
+
+# How many interviews may be inside each stage at once
+DEFAULT_STAGE_LIMITS = {
+    "fetch_candidate": 50,
+    "generate_questions": 8,
+    "evaluate_answers": 16,
+    "record_result": 4,
+    "email_result": 4,
+}
+
+QUESTIONS_PER_ROLE = 5
+
+# "failed" is permanent (e.g. unknown candidate); "error" is retried by resume_unfinished
+STOP_STATUSES = {"completed", "failed", "error"}
+
+
+class InterviewState(TypedDict, total=False):
+    interview_id: str
+    candidate_email: str
+    role: str
+    status: str
+    candidate_name: str
+    candidate: str
+    questions: list[str]
+    answers: list[str]
+    evaluation: dict
+    recording: bool
+    recorded: bool
+    emailing: bool
+    emailed: bool
+    error: str
+
+
+def next_stage(state: InterviewState) -> str:
+    """Route to the first stage whose output is missing."""
+    if state.get("status") in STOP_STATUSES:
+        return END
+    if not state.get("candidate"):
+        return "fetch_candidate"
+    if not state.get("questions"):
+        return "generate_questions"
+    if not state.get("answers"):
+        return END  # awaiting answers
+    if not state.get("evaluation"):
+        return "evaluate_answers"
+    if not state.get("recorded"):
+        return "record_result"
+    if not state.get("emailed"):
+        return "email_result"
+    return END
+
+
+async def generate_role_questions(role: str) -> list[str]:
+    reply = await ask_llm(
+        f"Write {QUESTIONS_PER_ROLE} technical interview questions for a '{role}' role.\n"
+        "Reply with only a JSON array of strings."
+    )
+    questions = parse_json(reply)
+    if not isinstance(questions, list):
+        questions = [line.strip("-*0123456789. ").strip() for line in reply.splitlines()]
+    questions = [str(q).strip() for q in questions if str(q).strip()][:QUESTIONS_PER_ROLE]
+    if not questions:
+        raise ValueError(f"The LLM returned no questions for role '{role}'")
+    return questions
+
+
+class InterviewEngine:
+    """Runs interviews through the workflow graph over shared MCP tools."""
+
+    def __init__(self, tools: dict, store: InterviewStore, stage_limits: dict = None, results_email: str = None):
+        self.tools = tools
+        self.store = store
+        # Evaluations are internal: they go to a recruiter, never to the candidate
+        self.results_email = results_email or os.getenv("INTERVIEW_RESULTS_EMAIL")
+        limits = {**DEFAULT_STAGE_LIMITS, **(stage_limits or {})}
+        self._limits = {stage: asyncio.Semaphore(limits[stage]) for stage in STAGES}
+        self.questions = QuestionCache(store, generate_role_questions)
+        self.graph = self._build_graph()
+
+    def _build_graph(self):
+        builder = StateGraph(InterviewState)
+        for stage in STAGES:
+            builder.add_node(stage, self._stage(stage, getattr(self, stage)))
+            builder.add_conditional_edges(stage, next_stage, STAGES + [END])
+        builder.add_conditional_edges(START, next_stage, STAGES + [END])
+        return builder.compile()
+
+    def _stage(self, name, fn):
+        """Wrap a stage with its concurrency limit and persist the state it produces."""
+        async def run(state: InterviewState):
+            async with self._limits[name]:
+                try:
+                    update = await fn(state)
+                except Exception as e:
+                    logger.exception("Interview %s failed in %s", state["interview_id"], name)
+                    update = {"status": "error", "error": f"{name}: {e}"}
+            await self.store.save({**state, **update})
+            return update
+        return run
+
+    async def _call(self, tool: str, args: dict) -> str:
+        result = await self.tools[tool].ainvoke(args)
+        return result if isinstance(result, str) else str(result)
+
+    # --- Stages ---
+
+    async def fetch_candidate(self, state: InterviewState):
+        profile = await self._call("get_candidate_by_email", {"email": state["candidate_email"]})
+        if profile.startswith("No candidate found"):
+            return {"status": "failed", "error": profile}
+        match = re.match(r"Name: (.*?), Email:", profile)
+        return {
+            "candidate": profile,
+            "candidate_name": match.group(1) if match else state["candidate_email"],
+            "status": "running",
+        }
+
+    async def generate_questions(self, state: InterviewState):
+        questions = await self.questions.get(state["role"])
+        return {"questions": questions, "status": "running" if state.get("answers") else "awaiting_answers"}
+
+    async def evaluate_answers(self, state: InterviewState):
+        transcript = "\n".join(
+            f"Q{i}: {q}\nA{i}: {a}" for i, (q, a) in enumerate(zip(state["questions"], state["answers"]), 1)
+        )
+        reply = await ask_llm(
+            f"Role: {state['role']}\nCandidate: {state['candidate']}\n\n{transcript}\n\n"
+            "Evaluate the answers. Reply with only JSON: "
+            "{\"score\": <0-10>, \"verdict\": \"pass\" or \"fail\", \"summary\": \"<two sentences>\"}",
+            "You are a strict but fair technical interviewer.",
+        )
+        evaluation = parse_json(reply)
+        if not isinstance(evaluation, dict):
+            evaluation = {"score": None, "verdict": "review", "summary": reply.strip()}
+        return {"evaluation": evaluation}
+
+    async def record_result(self, state: InterviewState):
+        if state.get("recording"):
+            # An earlier attempt may have appended the row before it was interrupted
+            sheet = await self._call("read_sheet", {"range_": "Sheet1"})
+            if state["interview_id"] in sheet:
+                return {"recorded": True}
+
+        evaluation = state["evaluation"]
+        await self.store.save({**state, "recording": True})
+        try:
+            await self._call("append_row", {"values": [
+                state["candidate_name"],
+                state["candidate_email"],
+                state["role"],
+                f"{evaluation.get('verdict')} ({evaluation.get('score')}/10)",
+                state["interview_id"],
+            ]})
+        except Exception as e:
+            return {"recording": True, "status": "error", "error": f"record_result: {e}"}
+        return {"recorded": True}
+
+    async def email_result(self, state: InterviewState):
+        if not self.results_email:
+            raise RuntimeError("INTERVIEW_RESULTS_EMAIL is not set; refusing to send the evaluation anywhere else")
+        if state.get("emailing"):
+            return {
+                "status": "failed",
+                "error": "email_result: an earlier send was interrupted and may have been delivered; not resending",
+            }
+
+        evaluation = state["evaluation"]
+        await self.store.save({**state, "emailing": True})
+        try:
+            result = await self._call("send_email", {
+                "to_email": self.results_email,
+                "subject": f"Interview result: {state['candidate_name']} - {state['role']} [{state['interview_id']}]",
+                "body": (
+                    f"Candidate: {state['candidate_name']} <{state['candidate_email']}>\n"
+                    f"Role: {state['role']}\n"
+                    f"Verdict: {evaluation.get('verdict')} ({evaluation.get('score')}/10)\n\n"
+                    f"{evaluation.get('summary', '')}"
+                ),
+            })
+        except Exception as e:
+            # Unknown whether it was delivered; the marker stops a resend
+            return {"emailing": True, "status": "error", "error": f"email_result: {e}"}
+        if "❌" in result:
+            # The server reported the send failed, so a retry can't duplicate it
+            return {"emailing": False, "status": "error", "error": f"email_result: {result}"}
+        return {"emailed": True, "status": "completed"}
+
+    # --- Entry points ---
+
+    async def _run(self, state: InterviewState) -> InterviewState:
+        if state.get("status") == "error":
+            state = {**state, "status": "running", "error": None}
+        return await self.graph.ainvoke(state)
+
+    async def start(self, candidate_email: str, role: str, answers: list[str] = None, interview_id: str = None):
+        """Start an interview. Without ``answers`` it stops at ``awaiting_answers``."""
+        state = {
+            "interview_id": interview_id or uuid.uuid4().hex,
+            "candidate_email": candidate_email,
+            "role": role,
+            "status": "pending",
+        }
+        if answers:
+            state["answers"] = answers
+        await self.store.save(state)
+        return await self._run(state)
+
+    async def submit_answers(self, interview_id: str, answers: list[str]):
+        state = await self.store.load(interview_id)
+        if state is None:
+            raise KeyError(f"Unknown interview {interview_id}")
+        state.update(answers=answers, status="running")
+        await self.store.save(state)
+        return await self._run(state)
+
+    async def run_many(self, interviews: list[dict], max_concurrent: int = 500):
+        """Start many interviews at once; stage limits bound the actual work in flight."""
+        await self.questions.warm(spec["role"] for spec in interviews)
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def run_one(spec):
+            async with semaphore:
+                return await self.start(**spec)
+
+        return await asyncio.gather(*(run_one(spec) for spec in interviews), return_exceptions=True)
+
+    async def resume_unfinished(self):
+        """Continue interviews interrupted by a crash or a retryable error."""
+        states = [s for s in await self.store.unfinished() if s.get("status") != "awaiting_answers"]
+        return await asyncio.gather(*(self._run(s) for s in states), return_exceptions=True)
+
+
+@asynccontextmanager
+async def open_engine(store_path: str = "interviews.db", stage_limits: dict = None, results_email: str = None):
+    """Open one MCP session per server and an engine that shares them."""
+    client = MultiServerMCPClient(MCP_SERVERS)
+    store = await InterviewStore.open(store_path)
+    try:
+        async with AsyncExitStack() as stack:
+            tools = {}
+            for server in MCP_SERVERS:
+                session = await stack.enter_async_context(client.session(server))
+                for tool in await load_mcp_tools(session):
+                    tools[tool.name] = tool
+            yield InterviewEngine(tools, store, stage_limits, results_email)
+    finally:
+        await store.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run interviews from a JSONL file")
+    parser.add_argument("input", nargs="?", help='JSONL lines: {"candidate_email", "role", "answers"?}')
+    parser.add_argument("--resume", action="store_true", help="continue unfinished interviews first")
+    parser.add_argument("--store", default=os.getenv("INTERVIEW_STORE", "interviews.db"))
+    parser.add_argument(
+        "--results-email",
+        default=os.getenv("INTERVIEW_RESULTS_EMAIL"),
+        help="recruiter address that receives evaluations (default: $INTERVIEW_RESULTS_EMAIL)",
+    )
+    args = parser.parse_args()
+    if not args.results_email:
+        parser.error("a recruiter address is required: pass --results-email or set INTERVIEW_RESULTS_EMAIL")
+
+    async with open_engine(args.store, results_email=args.results_email) as engine:
+        results = []
+        if args.resume:
+            results += await engine.resume_unfinished()
+        if args.input:
+            with open(args.input, encoding="utf-8") as f:
+                interviews = [json.loads(line) for line in f if line.strip()]
+            results += await engine.run_many(interviews)
+
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"❌ {result}")
+        else:
+            print(f"{result['interview_id']}: {result.get('status')} {result.get('error') or ''}".rstrip())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Persistence and caching helpers for the interview workflow."""
+
+import asyncio
+import json
+import logging
+import re
+import time
+
+from mcp_server.sql_database import Database
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = {"completed", "failed"}
+
+
+def parse_json(text: str, default=None):
+    """Parse JSON from an LLM reply, tolerating ```json fences."""
+    clean = re.sub(r"^```(?:json)?|```$", "", (text or "").strip(), flags=re.MULTILINE).strip()
+    try:
+        return json.loads(clean)
+    except ValueError:
+        return default
+
+
+def normalize_role(role: str) -> str:
+    return " ".join(role.lower().split())
+
+
+class InterviewStore:
+    """Interview state and question sets in SQLite, so runs survive restarts."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    @classmethod
+    async def open(cls, path: str = "interviews.db"):
+        db = await Database.connect(path)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS interviews (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS question_sets (
+                role TEXT PRIMARY KEY,
+                questions TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        return cls(db)
+
+    async def close(self):
+        await self.db.disconnect()
+
+    async def load(self, interview_id: str):
+        rows = await self.db.query("SELECT state FROM interviews WHERE id = $1", interview_id)
+        return json.loads(rows[0]["state"]) if rows else None
+
+    async def save(self, state: dict):
+        await self.db.execute(
+            "INSERT INTO interviews (id, status, state, updated_at) VALUES ($1, $2, $3, $4) "
+            "ON CONFLICT(id) DO UPDATE SET status = excluded.status, state = excluded.state, "
+            "updated_at = excluded.updated_at",
+            state["interview_id"], state.get("status", "pending"), json.dumps(state), time.time(),
+        )
+
+    async def unfinished(self) -> list[dict]:
+        """States of interviews that stopped before completing (crash, restart, awaiting answers)."""
+        rows = await self.db.query(
+            "SELECT state FROM interviews WHERE status NOT IN ($1, $2) ORDER BY updated_at",
+            *sorted(FINAL_STATUSES),
+        )
+        return [json.loads(row["state"]) for row in rows]
+
+    async def load_questions(self, role: str):
+        rows = await self.db.query("SELECT questions FROM question_sets WHERE role = $1", role)
+        return json.loads(rows[0]["questions"]) if rows else None
+
+    async def save_questions(self, role: str, questions: list[str]):
+        await self.db.execute(
+            "INSERT OR REPLACE INTO question_sets (role, questions, created_at) VALUES ($1, $2, $3)",
+            role, json.dumps(questions), time.time(),
+        )
+
+
+class QuestionCache:
+    """Question sets per role: memory, then the store, then one shared LLM call.
+
+    Concurrent interviews for the same uncached role wait on a single
+    generation instead of each calling the LLM.
+    """
+
+    def __init__(self, store: InterviewStore, generate):
+        self.store = store
+        self.generate = generate
+        self._memory = {}
+        self._inflight = {}
+
+    async def get(self, role: str) -> list[str]:
+        key = normalize_role(role)
+        if key in self._memory:
+            return self._memory[key]
+        if key not in self._inflight:
+            self._inflight[key] = asyncio.ensure_future(self._load_or_generate(key, role))
+        try:
+            return await asyncio.shield(self._inflight[key])
+        finally:
+            if self._inflight.get(key) is not None and self._inflight[key].done():
+                self._inflight.pop(key, None)
+
+    async def _load_or_generate(self, key: str, role: str) -> list[str]:
+        questions = await self.store.load_questions(key)
+        if not questions:
+            questions = await self.generate(role)
+            # An empty set would be served forever and leave interviews without questions
+            if not questions:
+                raise ValueError(f"No questions were generated for role '{role}'")
+            await self.store.save_questions(key, questions)
+        self._memory[key] = questions
+        return questions
+
+    async def warm(self, roles):
+        """Precompute question sets, e.g. for every open role before a batch.
+
+        Best effort: a role that fails here is retried (and its error reported)
+        by each interview that needs it.
+        """
+        roles = sorted(set(roles))
+        results = await asyncio.gather(*(self.get(role) for role in roles), return_exceptions=True)
+        for role, result in zip(roles, results):
+            if isinstance(result, Exception):
+                logger.warning("Could not prepare questions for role %r: %s", role, result)